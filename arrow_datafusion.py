@@ -10,11 +10,18 @@ License: MIT
 GitHub: https://github.com/Zeutschler/sql-mandelbrot-benchmark
 """
 
+import os
+
 import numpy as np
-from datafusion import SessionContext
+import pyarrow as pa
+from datafusion import SessionConfig, SessionContext
 
+from mandelbrot_sql import build_query
 from utils import save_mandelbrot_image
 
+# One session per process, reused by every call instead of rebuilt each time
+_CTX = SessionContext(SessionConfig().with_target_partitions(os.cpu_count()))
+
 
 def run_arrow_datafusion(width, height, max_iterations):
     """
@@ -28,59 +35,19 @@ def run_arrow_datafusion(width, height, max_iterations):
     Returns:
         2D numpy array of iteration counts
     """
-    # Build the SQL query
-    mandelbrot_query = f"""
-    WITH RECURSIVE
-      pixels AS (
-        SELECT
-          x::INTEGER AS x,
-          y::INTEGER AS y,
-          -2.5 + (x::DOUBLE * 3.5 / {width - 1}.0) AS cx,
-          -1.0 + (y::DOUBLE * 2.0 / {height - 1}.0) AS cy
-        FROM
-          generate_series(0, {width - 1}) AS t1(x),
-          generate_series(0, {height - 1}) AS t2(y)
-      ),
-      mandelbrot_iterations AS (
-        SELECT
-          x, y, cx, cy,
-          0.0::DOUBLE AS zx,
-          0.0::DOUBLE AS zy,
-          0 AS iteration
-        FROM pixels
-
-        UNION ALL
-
-        SELECT
-          m.x,
-          m.y,
-          m.cx,
-          m.cy,
-          (m.zx * m.zx - m.zy * m.zy + m.cx)::DOUBLE AS zx,
-          (2.0 * m.zx * m.zy + m.cy)::DOUBLE AS zy,
-          m.iteration + 1 AS iteration
-        FROM mandelbrot_iterations m
-        WHERE
-          m.iteration < {max_iterations}
-          AND (m.zx * m.zx + m.zy * m.zy) <= 4.0
-      )
-    SELECT
-      x,
-      y,
-      MAX(iteration) AS depth
-    FROM mandelbrot_iterations
-    GROUP BY x, y
-    ORDER BY y, x;
-    """
-    ctx = SessionContext()
-
-    # Execute query
-    result = ctx.sql(mandelbrot_query).to_pylist()
-
-    # Convert to numpy array
-    mandelbrot = np.zeros((height, width), dtype=np.uint16)
-    for r in result:
-        mandelbrot[r["y"], r["x"]] = r["depth"]
+    # The query text is built once per image size
+    mandelbrot_query = build_query(width, height, max_iterations)
+
+    # Execute query, the result stays columnar as a list of record batches
+    batches = _CTX.sql(mandelbrot_query).collect()
+    result = pa.Table.from_batches(batches)
+
+    # Rows arrive in any order, scatter each depth to its (y, x) pixel
+    mandelbrot = np.empty((height, width), dtype=np.uint16)
+    mandelbrot[
+        result.column("y").to_numpy(zero_copy_only=False),
+        result.column("x").to_numpy(zero_copy_only=False),
+    ] = result.column("depth").to_numpy(zero_copy_only=False)
 
     return mandelbrot
 
@@ -9,10 +9,26 @@ License: MIT
 GitHub: https://github.com/Zeutschler/sql-mandelbrot-benchmark
 """
 
+import os
+
 import duckdb
 import numpy as np
+
+from mandelbrot_sql import SQL_TEMPLATE
 from utils import save_mandelbrot_image
 
+# The shared query with DuckDB's named parameters in place of the placeholders
+MANDELBROT_QUERY = SQL_TEMPLATE.format(
+    width="$width", height="$height", max_iterations="$max_iterations"
+)
+
+# One connection per process: thread pool, catalog and the prepared statement
+# are set up once at import instead of on every call
+_CONN = duckdb.connect(":memory:", config={"threads": os.cpu_count()})
+# Rows are placed by their x, y columns, so DuckDB need not keep them in order
+_CONN.execute("SET preserve_insertion_order = false")
+_CONN.execute(f"PREPARE mandelbrot AS {MANDELBROT_QUERY}")
+
 
 def run_duckbrot(width, height, max_iterations):
     """
@@ -26,59 +42,17 @@ def run_duckbrot(width, height, max_iterations):
     Returns:
         2D numpy array of iteration counts
     """
-    # Build the SQL query
-    mandelbrot_query = f"""
-    WITH RECURSIVE
-      pixels AS (
-        SELECT
-          x::INTEGER AS x,
-          y::INTEGER AS y,
-          -2.5 + (x::DOUBLE * 3.5 / {width - 1}.0) AS cx,
-          -1.0 + (y::DOUBLE * 2.0 / {height - 1}.0) AS cy
-        FROM
-          generate_series(0, {width - 1}) AS t1(x),
-          generate_series(0, {height - 1}) AS t2(y)
-      ),
-      mandelbrot_iterations AS (
-        SELECT
-          x, y, cx, cy,
-          0.0::DOUBLE AS zx,
-          0.0::DOUBLE AS zy,
-          0 AS iteration
-        FROM pixels
-
-        UNION ALL
-
-        SELECT
-          m.x,
-          m.y,
-          m.cx,
-          m.cy,
-          (m.zx * m.zx - m.zy * m.zy + m.cx)::DOUBLE AS zx,
-          (2.0 * m.zx * m.zy + m.cy)::DOUBLE AS zy,
-          m.iteration + 1 AS iteration
-        FROM mandelbrot_iterations m
-        WHERE
-          m.iteration < {max_iterations}
-          AND (m.zx * m.zx + m.zy * m.zy) <= 4.0
-      )
-    SELECT
-      x,
-      y,
-      MAX(iteration) AS depth
-    FROM mandelbrot_iterations
-    GROUP BY x, y
-    ORDER BY y, x;
-    """
-
-    # Execute query
-    conn = duckdb.connect()
-    result = conn.execute(mandelbrot_query).fetchall()
+    # Execute the prepared query (EXECUTE itself cannot take ? placeholders)
+    result = _CONN.execute(
+        f"EXECUTE mandelbrot(width := {int(width)}, height := {int(height)}, "
+        f"max_iterations := {int(max_iterations)})"
+    ).fetch_arrow_table()
 
-    # Convert to numpy array
-    mandelbrot = np.zeros((height, width), dtype=np.uint16)
-    for x, y, depth in result:
-        mandelbrot[y, x] = depth
+    # Rows arrive in any order, scatter each depth to its (y, x) pixel
+    mandelbrot = np.empty((height, width), dtype=np.uint16)
+    mandelbrot[result.column("y").to_numpy(), result.column("x").to_numpy()] = (
+        result.column("depth").to_numpy()
+    )
 
     return mandelbrot
 
@@ -1,44 +1,175 @@
 """
-PyBrot - Pure Python Mandelbrot Set Computation
+FasterPyBrot - Numba-compiled Mandelbrot Set Computation
 
-This is a reference implementation in pure Python (no shortcuts like NumPy)
-to compare against the SQL-based DuckBrot benchmark. It computes the same
-Mandelbrot set using traditional procedural code.
+The escape-time loop is JIT-compiled with Numba, so the per-pixel iteration
+runs as native code instead of CPython bytecode. The image is split into
+cache-sized tiles that are distributed across all CPU cores. Without Numba,
+a vectorized NumPy version that only iterates the still-alive pixels is used
+instead.
+
+If the optional AVX2/AVX-512 row kernel has been built (`make simd`), it is
+loaded via ctypes and takes precedence over both.
 
 Author: Ulrich Ludmann
 License: MIT
 GitHub: https://github.com/Zeutschler/sql-mandelbrot-benchmark
 """
 
-from utils import save_mandelbrot_image
+import ctypes
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils import PERIOD_CHECK_INTERVAL, in_cardioid_or_bulb, save_mandelbrot_image
+
+try:
+    import numba
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Optional SIMD row kernel, see pybrot_simd.c
+SIMD_LIBRARY = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "pybrot_simd.so"
+)
+try:
+    _simd = ctypes.CDLL(SIMD_LIBRARY)
+    _simd.compute_row.argtypes = [
+        ctypes.c_double,
+        ctypes.c_double,
+        ctypes.c_double,
+        ctypes.c_void_p,
+        ctypes.c_int,
+        ctypes.c_int,
+    ]
+    _simd.compute_row.restype = None
+    SIMD_AVAILABLE = True
+except OSError:
+    SIMD_AVAILABLE = False
+
+# Number of iterations between two compactions of the alive pixels (NumPy path)
+COMPACT_INTERVAL = 16
+
+# Edge length of the square tiles the image is split into. A 128x128 uint16
+# tile (32 KB) stays resident in L1/L2 while it is computed, and tiles are
+# handed out dynamically, so tiles crossing the set do not become stragglers.
+TILE_SIZE = 128
+
+
+if NUMBA_AVAILABLE:
+    _in_cardioid_or_bulb = numba.njit(cache=True, fastmath=True)(in_cardioid_or_bulb)
 
+    @numba.njit(cache=True, fastmath=True, parallel=True)
+    def _mandel_kernel(out, width, height, max_iter):
+        """
+        Fill `out` with the iteration counts of every pixel (compiled with Numba).
 
-def mandelbrot_iteration(cx, cy, max_iterations):
+        Args:
+            out: Preallocated uint16 array of shape (height, width)
+            width: Image width in pixels
+            height: Image height in pixels
+            max_iter: Maximum iterations per pixel
+        """
+        tiles_x = (width + TILE_SIZE - 1) // TILE_SIZE
+        tiles_y = (height + TILE_SIZE - 1) // TILE_SIZE
+        for tile in numba.prange(tiles_x * tiles_y):
+            x_start = (tile % tiles_x) * TILE_SIZE
+            y_start = (tile // tiles_x) * TILE_SIZE
+            for y in range(y_start, min(y_start + TILE_SIZE, height)):
+                cy = -1.0 + y * 2.0 / (height - 1)
+                for x in range(x_start, min(x_start + TILE_SIZE, width)):
+                    cx = -2.5 + x * 3.5 / (width - 1)
+                    if _in_cardioid_or_bulb(cx, cy):
+                        out[y, x] = max_iter
+                        continue
+                    zx = 0.0
+                    zy = 0.0
+                    ref_zx = 0.0
+                    ref_zy = 0.0
+                    i = 0
+                    while i < max_iter:
+                        zx_squared = zx * zx
+                        zy_squared = zy * zy
+                        if zx_squared + zy_squared > 4.0:
+                            break
+                        zx, zy = zx_squared - zy_squared + cx, 2.0 * zx * zy + cy
+                        i += 1
+                        # z returned to an earlier value: the orbit is periodic
+                        # and the point is bounded
+                        if zx == ref_zx and zy == ref_zy:
+                            i = max_iter
+                            break
+                        if i % PERIOD_CHECK_INTERVAL == 0:
+                            ref_zx = zx
+                            ref_zy = zy
+                    out[y, x] = i
+
+
+def compute_mandelbrot_numpy(width, height, max_iterations):
     """
-    Calculate the number of iterations for a single point in the complex plane.
+    Compute the Mandelbrot set with NumPy, iterating only the alive pixels.
+
+    All pixels are iterated as one flat array. Every COMPACT_INTERVAL
+    iterations the escaped pixels are dropped from the working arrays, so
+    later iterations touch fewer and fewer bytes.
 
     Args:
-        cx: Real part of complex number c
-        cy: Imaginary part of complex number c
-        max_iterations: Maximum number of iterations to test
+        width: Image width in pixels
+        height: Image height in pixels
+        max_iterations: Maximum iterations per pixel
 
     Returns:
-        Number of iterations before escape (or max_iterations if bounded)
+        2D NumPy array of iteration counts (height x width)
     """
-    zx = 0.0
-    zy = 0.0
-    for i in range(max_iterations):
-        zx_squared = zx * zx
-        zy_squared = zy * zy
-        if zx_squared + zy_squared > 4.0:
-            return i
-        zx, zy = zx_squared - zy_squared + cx, 2.0 * zx * zy + cy
-    return max_iterations
+    cx = -2.5 + np.arange(width) * 3.5 / (width - 1)
+    cy = -1.0 + np.arange(height) * 2.0 / (height - 1)
 
+    # Real and imaginary parts live in separate arrays (no complex128), so
+    # every step is plain multiply-add on contiguous float64 data
+    cr = np.tile(cx, height)
+    ci = np.repeat(cy, width)
+    zx = np.zeros(cr.size, dtype=np.float64)
+    zy = np.zeros(cr.size, dtype=np.float64)
 
-def compute_mandelbrot(width, height, max_iterations):
+    # Original pixel position of every lane in the working arrays
+    index = np.arange(cr.size)
+    mandelbrot = np.full(cr.size, max_iterations, dtype=np.uint16)
+
+    # Points inside the main cardioid or period-2 bulb keep max_iterations
+    alive = ~in_cardioid_or_bulb(cr, ci)
+
+    # Escaped lanes keep iterating until the next compaction and overflow
+    with np.errstate(over="ignore", invalid="ignore"):
+        for i in range(max_iterations):
+            if i % COMPACT_INTERVAL == 0:
+                if not alive.any():
+                    break
+                zx = zx[alive]
+                zy = zy[alive]
+                cr = cr[alive]
+                ci = ci[alive]
+                index = index[alive]
+                alive = np.ones(cr.size, dtype=bool)
+
+            zx_squared = zx * zx
+            zy_squared = zy * zy
+            escaped = alive & ((zx_squared + zy_squared) > 4.0)
+            mandelbrot[index[escaped]] = i
+            alive &= ~escaped
+
+            zx, zy = zx_squared - zy_squared + cr, 2.0 * zx * zy + ci
+
+    return mandelbrot.reshape(height, width)
+
+
+def compute_mandelbrot_simd(width, height, max_iterations):
     """
-    Compute the Mandelbrot set for the entire image.
+    Compute the Mandelbrot set tile by tile with the C SIMD row kernel.
+
+    Tiles of TILE_SIZE x TILE_SIZE pixels are processed by a thread pool;
+    ctypes releases the GIL while the C kernel runs, so tiles run in parallel.
 
     Args:
         width: Image width in pixels
@@ -46,25 +177,78 @@ def compute_mandelbrot(width, height, max_iterations):
         max_iterations: Maximum iterations per pixel
 
     Returns:
-        2D list of iteration counts (height x width)
+        2D NumPy array of iteration counts (height x width)
     """
-    # Initialize result array
-    width_1 = width - 1
-    height_1 = height - 1
-    return [
-        [
-            mandelbrot_iteration(
-                -2.5 + x * 3.5 / width_1, -1.0 + y * 2.0 / height_1, max_iterations
+    mandelbrot = np.empty((height, width), dtype=np.uint16)
+    dcx = 3.5 / (width - 1)
+    address = mandelbrot.ctypes.data
+    row_bytes = mandelbrot.strides[0]
+
+    def compute_tile(origin):
+        y_start, x_start = origin
+        tile_width = min(TILE_SIZE, width - x_start)
+        cx0 = -2.5 + x_start * dcx
+        for y in range(y_start, min(y_start + TILE_SIZE, height)):
+            cy = -1.0 + y * 2.0 / (height - 1)
+            _simd.compute_row(
+                cy,
+                cx0,
+                dcx,
+                address + y * row_bytes + x_start * mandelbrot.itemsize,
+                tile_width,
+                max_iterations,
             )
-            for x in range(width)
-        ]
-        for y in range(height)
+
+    tiles = [
+        (y_start, x_start)
+        for y_start in range(0, height, TILE_SIZE)
+        for x_start in range(0, width, TILE_SIZE)
     ]
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(compute_tile, tiles))
+    return mandelbrot
+
+
+def compute_mandelbrot_numba(width, height, max_iterations):
+    """
+    Compute the Mandelbrot set tile by tile with the Numba-compiled kernel.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        max_iterations: Maximum iterations per pixel
+
+    Returns:
+        2D NumPy array of iteration counts (height x width)
+    """
+    mandelbrot = np.empty((height, width), dtype=np.uint16)
+    with numba.parallel_chunksize(1):
+        _mandel_kernel(mandelbrot, width, height, max_iterations)
+    return mandelbrot
+
+
+def compute_mandelbrot(width, height, max_iterations):
+    """
+    Compute the Mandelbrot set for the entire image.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        max_iterations: Maximum iterations per pixel
+
+    Returns:
+        2D NumPy array of iteration counts (height x width)
+    """
+    if SIMD_AVAILABLE:
+        return compute_mandelbrot_simd(width, height, max_iterations)
+    if NUMBA_AVAILABLE:
+        return compute_mandelbrot_numba(width, height, max_iterations)
+    return compute_mandelbrot_numpy(width, height, max_iterations)
 
 
 def run_pybrot(width, height, max_iterations):
     """
-    Compute Mandelbrot set using pure Python (no shortcuts).
+    Compute Mandelbrot set using the fastest available compiled kernel.
 
     Args:
         width: Image width in pixels
@@ -72,7 +256,7 @@ def run_pybrot(width, height, max_iterations):
         max_iterations: Maximum iterations per pixel
 
     Returns:
-        2D list of iteration counts
+        2D NumPy array of iteration counts
     """
     return compute_mandelbrot(width, height, max_iterations)
 
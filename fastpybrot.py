@@ -10,7 +10,11 @@ License: MIT
 GitHub: https://github.com/Zeutschler/sql-mandelbrot-benchmark
 """
 
-from utils import save_mandelbrot_image
+from array import array
+
+import numpy as np
+
+from utils import in_cardioid_or_bulb, save_mandelbrot_image
 
 
 def mandelbrot_iteration(cx, cy, max_iterations):
@@ -25,6 +29,9 @@ def mandelbrot_iteration(cx, cy, max_iterations):
     Returns:
         Number of iterations before escape (or max_iterations if bounded)
     """
+    if in_cardioid_or_bulb(cx, cy):
+        return max_iterations
+
     zx = 0.0
     zy = 0.0
 
@@ -53,10 +60,11 @@ def compute_mandelbrot(width, height, max_iterations):
         max_iterations: Maximum iterations per pixel
 
     Returns:
-        2D list of iteration counts (height x width)
+        2D numpy uint16 array of iteration counts (height x width)
     """
-    # Initialize result array
-    mandelbrot = [[0 for _ in range(width)] for _ in range(height)]
+    # Initialize result array: one flat, compact uint16 buffer instead of
+    # height x width boxed Python ints
+    mandelbrot = array("H", bytes(2 * width * height))
 
     # Compute complex coordinates for each pixel
     for y in range(height):
@@ -67,9 +75,9 @@ def compute_mandelbrot(width, height, max_iterations):
             cy = -1.0 + (y * 2.0 / (height - 1))
 
             # Compute iterations for this point
-            mandelbrot[y][x] = mandelbrot_iteration(cx, cy, max_iterations)
+            mandelbrot[y * width + x] = mandelbrot_iteration(cx, cy, max_iterations)
 
-    return mandelbrot
+    return np.frombuffer(mandelbrot, dtype=np.uint16).reshape(height, width)
 
 
 def run_pybrot(width, height, max_iterations):
@@ -82,7 +90,7 @@ def run_pybrot(width, height, max_iterations):
         max_iterations: Maximum iterations per pixel
 
     Returns:
-        2D list of iteration counts
+        2D numpy array of iteration counts
     """
     return compute_mandelbrot(width, height, max_iterations)
 
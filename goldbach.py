@@ -1,15 +1,35 @@
 """
-Goldbach Conjecture Implementation using DuckDB
+Goldbach Conjecture Implementation using NumPy
 
-This implementation computes Goldbach pairs (representing even numbers as sum of two primes)
-using DuckDB in plain SQL — no loops, no procedural code, just pure SQL.
+This implementation computes Goldbach pairs (representing even numbers as sum of two primes).
+Primes come from a vectorized Sieve of Eratosthenes, and the smallest pair of every even
+number is found by testing all open even numbers against one prime at a time.
 
 
 
 Author: Thomas Zeutschler
 """
+
 from datetime import datetime
-import duckdb
+import numpy as np
+
+
+def prime_sieve(max_n):
+    """
+    Sieve of Eratosthenes
+
+    Args:
+        max_n: Largest number to test
+
+    Returns:
+        Boolean numpy array, True at every prime index 0..max_n
+    """
+    sieve = np.ones(max_n + 1, dtype=bool)
+    sieve[:2] = False
+    for p in range(2, int(max_n**0.5) + 1):
+        if sieve[p]:
+            sieve[p * p :: p] = False
+    return sieve
 
 
 def run_goldbach(max_iterations):
@@ -17,90 +37,37 @@ def run_goldbach(max_iterations):
     Compute Goldbach
 
     Args:
-        max_iterations: Maximum iterations per pixel
+        max_iterations: Largest even number to decompose
 
     Returns:
-        2D numpy array of iteration counts
+        List of (even_n, p, q) tuples with the smallest prime p
     """
-    # Build the SQL query
-    mandelbrot_query = f"""
--- Goldbach bis MAX_N in DuckDB, vektorisiert & ohne Rekursion
-WITH
-params AS (
-  SELECT {max_iterations}::BIGINT AS max_n
-),
-
--- 1) Zahlen 2..MAX_N
-nums(n) AS (
-  SELECT n
-  FROM generate_series(2, (SELECT max_n FROM params)) AS gs(n)
-),
-
--- 2) Faktoren 2..floor(sqrt(MAX_N))
-factors(d) AS (
-  SELECT d
-  FROM generate_series(
-         2,
-         CAST(floor(sqrt((SELECT max_n FROM params))) AS BIGINT)
-       ) AS gs(d)
-),
-
--- 3) Alle Kompositzahlen als d * k (k beginnt bei 2 bis MAX_N/d)
-composites(n) AS (
-  SELECT f.d * k AS n
-  FROM factors f
-  CROSS JOIN LATERAL generate_series(
-           2,
-           CAST((SELECT max_n FROM params) / f.d AS BIGINT)
-       ) AS ks(k)
-),
-
--- 4) Primzahlen = alle minus Kompositzahlen
-primes(p) AS (
-  SELECT n FROM nums
-  EXCEPT
-  SELECT n FROM composites
-),
-
--- 5) Gerade N (>= 4)
-evens(n) AS (
-  SELECT n FROM generate_series(4, (SELECT max_n FROM params), 2) AS gs(n)
-),
-
--- 6) Goldbach-Paare (nur kleinstes p je N)
-pairs AS (
-  SELECT
-    e.n,
-    p1.p AS p,
-    (e.n - p1.p) AS q,
-    ROW_NUMBER() OVER (PARTITION BY e.n ORDER BY p1.p) AS rn
-  FROM evens e
-  JOIN primes p1
-    ON p1.p <= e.n / 2
-  JOIN primes p2
-    ON p2.p = e.n - p1.p
-)
-
--- 7) Ergebnis: pro N das erste (kleinste) Paar, plus Hook für T(p,q,N)
-SELECT
-  n         AS even_n,
-  p,
-  q,
-  /* TODO: Formel für T(p,q,N) hier als SQL-Ausdruck einsetzen */
-  NULL::DOUBLE AS T_placeholder
-FROM pairs
-WHERE rn = 1
-ORDER BY even_n;
-"""
-
-    # Execute query
-    conn = duckdb.connect()
     start = datetime.now()
-    result = conn.execute(mandelbrot_query).fetchall()
+
+    # 1) Primes 2..MAX_N
+    sieve = prime_sieve(max_iterations)
+    primes = np.flatnonzero(sieve)
+
+    # 2) Even N (>= 4)
+    evens = np.arange(4, max_iterations + 1, 2)
+
+    # 3) Goldbach pairs (smallest p per N only): try primes in ascending order,
+    #    the first p with N - p prime is the smallest one
+    smallest_p = np.zeros(evens.size, dtype=np.int64)
+    open_idx = np.arange(evens.size)
+    for p in primes:
+        if open_idx.size == 0:
+            break
+        n = evens[open_idx]
+        found = (p <= n // 2) & sieve[n - p]
+        smallest_p[open_idx[found]] = p
+        open_idx = open_idx[~found]
+
     duration = datetime.now() - start
-    print(f"Query took {duration.total_seconds():.4f} seconds")
-    return result
+    print(f"Computation took {duration.total_seconds():.4f} seconds")
 
+    # 4) Result: per N the first (smallest) pair
+    return list(zip(evens.tolist(), smallest_p.tolist(), (evens - smallest_p).tolist()))
 
 
 if __name__ == "__main__":
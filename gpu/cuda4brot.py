@@ -0,0 +1,172 @@
+"""
+Cuda4brot - CUDA GPU Mandelbrot Set Computation
+
+This implementation uses PyCUDA to compute the Mandelbrot set on NVIDIA GPUs.
+It compiles the same kernel as opencl4brot (see mandelbrot_kernel.py): the
+OpenCL qualifiers and work-item ids are mapped to CUDA by a short prelude.
+
+The CUDA context and one module per image size are created on first use and
+reused. Counts are written as one byte per pixel into device memory and
+copied asynchronously into page-locked (pinned) host memory.
+
+Not yet verified on real PyCUDA/NVIDIA hardware: the kernel has only been
+checked by compiling it as C++ with emulated block and thread ids.
+
+Author: Thomas Zeutschler
+License: MIT
+GitHub: https://github.com/Zeutschler/sql-mandelbrot-benchmark
+"""
+
+import numpy as np
+
+try:
+    import pycuda.driver as cuda
+    from pycuda.compiler import SourceModule
+except ImportError as e:
+    raise ImportError(
+        "PyCUDA is not installed. Install with: pip install pycuda"
+    ) from e
+
+try:
+    from gpu.mandelbrot_kernel import (
+        KERNEL_SOURCE,
+        MAX_ITERATIONS_UCHAR,
+        kernel_defines,
+    )
+except ImportError:
+    # Run as a script (python gpu/cuda4brot.py or from inside gpu/)
+    from mandelbrot_kernel import KERNEL_SOURCE, MAX_ITERATIONS_UCHAR, kernel_defines
+
+# Maps the OpenCL C of the shared kernel to CUDA. SourceModule wraps the
+# source in extern "C", so the kernel keeps its unmangled name
+CUDA_PRELUDE = """
+typedef unsigned char uchar;
+#define __kernel __global__
+#define __global
+#define get_global_id(dim) ((dim) == 0 ? blockIdx.x * blockDim.x + threadIdx.x \\
+                                       : blockIdx.y * blockDim.y + threadIdx.y)
+"""
+
+# Pixels per thread along x (thread coarsening)
+COARSE_X = 4
+
+# Threads per block: 256 threads, a multiple of the 32-wide warps
+BLOCK_SIZE = (16, 16, 1)
+
+# The kernel only compares |z|^2 against 4, so fast math does not change it
+NVCC_OPTIONS = ["--use_fast_math"]
+
+# CUDA objects are expensive to create, so they are built once and reused;
+# the kernels are cached per (width, height, max_iterations)
+_stream = None
+_kernels = {}
+_buffers = {}
+
+
+def _get_kernel(width, height, max_iterations):
+    """
+    Compile (once per image size) and return the mandelbrot kernel and the stream.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        max_iterations: Maximum iterations per pixel
+
+    Returns:
+        Tuple of (kernel_function, stream)
+    """
+    global _stream
+
+    if _stream is None:
+        # Creates the context on the first device and pops it at exit
+        import pycuda.autoinit  # noqa: F401
+
+        _stream = cuda.Stream()
+
+    key = (width, height, max_iterations)
+    if key not in _kernels:
+        options = NVCC_OPTIONS + kernel_defines(width, height, max_iterations, COARSE_X)
+        module = SourceModule(CUDA_PRELUDE + KERNEL_SOURCE, options=options)
+        _kernels[key] = module.get_function("mandelbrot")
+
+    return _kernels[key], _stream
+
+
+def _get_buffers(padded_width, padded_height):
+    """
+    Return the device output buffer and the pinned host buffer for one padded size.
+
+    Args:
+        padded_width: Row length of the padded output in pixels
+        padded_height: Number of rows of the padded output
+
+    Returns:
+        Tuple of (device_allocation, pinned_host_array)
+    """
+    key = (padded_width, padded_height)
+    if key not in _buffers:
+        _buffers[key] = (
+            cuda.mem_alloc(padded_width * padded_height),
+            cuda.pagelocked_empty((padded_height, padded_width), np.uint8),
+        )
+    return _buffers[key]
+
+
+def run_cuda4brot(width, height, max_iterations):
+    """
+    Compute Mandelbrot set using CUDA GPU acceleration.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        max_iterations: Maximum iterations per pixel
+
+    Returns:
+        2D numpy array of iteration counts
+    """
+    if max_iterations > MAX_ITERATIONS_UCHAR:
+        raise ValueError(
+            f"max_iterations must be <= {MAX_ITERATIONS_UCHAR} for the 8-bit output"
+        )
+
+    kernel, stream = _get_kernel(width, height, max_iterations)
+
+    # One thread per COARSE_X pixels of a row; the grid covers whole blocks
+    # and the output is padded to match, so the kernel needs no bounds check
+    grid = (-(-width // (COARSE_X * BLOCK_SIZE[0])), -(-height // BLOCK_SIZE[1]))
+    padded_width = grid[0] * BLOCK_SIZE[0] * COARSE_X
+    padded_height = grid[1] * BLOCK_SIZE[1]
+    device_output, host_output = _get_buffers(padded_width, padded_height)
+
+    kernel(
+        device_output,
+        np.int32(padded_width),
+        block=BLOCK_SIZE,
+        grid=grid,
+        stream=stream,
+    )
+
+    # Asynchronous copy into pinned memory, then wait for the stream
+    cuda.memcpy_dtoh_async(host_output, device_output, stream)
+    stream.synchronize()
+
+    return host_output[:height, :width].astype(np.uint16) + 1
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    # utils.py lives in the repository root
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils import save_mandelbrot_image
+
+    WIDTH = 1400
+    HEIGHT = 800
+    MAX_ITERATIONS = 256
+
+    print(
+        f"Computing Mandelbrot set with CUDA ({WIDTH}x{HEIGHT}, max {MAX_ITERATIONS} iterations)..."
+    )
+    result = run_cuda4brot(WIDTH, HEIGHT, MAX_ITERATIONS)
+    save_mandelbrot_image(result, MAX_ITERATIONS, "cuda4brot.png")
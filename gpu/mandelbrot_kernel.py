@@ -0,0 +1,134 @@
+"""
+Mandelbrot GPU kernel shared by the OpenCL and CUDA backends
+
+The kernel is written in OpenCL C. cuda4brot compiles the same source with
+a few macros that map the OpenCL qualifiers and work-item ids to CUDA.
+
+Author: Thomas Zeutschler
+License: MIT
+GitHub: https://github.com/Zeutschler/sql-mandelbrot-benchmark
+"""
+
+# Every work-item computes COARSE_X neighbouring pixels of one row with
+# independent z states, so their iterations can be issued in parallel and
+# the cy derivation is shared.
+#
+# The view and the iteration limit are compile-time constants (X0, Y0, DX,
+# DY, MAX_ITER), so each coordinate is a single multiply-add instead of a
+# division per pixel; one program is built per image size.
+#
+# The output is padded to whole work-groups (pitch = padded row length), so
+# no work-item needs a bounds check; the host slices the image out of it.
+#
+# Counts are written as uchar to halve the output traffic. Every pixel does
+# at least one iteration (z starts at 0), so count - 1 is stored, which
+# covers counts up to 256; the host adds the 1 back.
+KERNEL_SOURCE = """
+#ifndef COARSE_X
+#define COARSE_X 4
+#endif
+
+#define PERIOD_CHECK_INTERVAL 20
+
+__kernel void mandelbrot(__global uchar *output,
+                        const int pitch)
+{
+    int x0 = get_global_id(0) * COARSE_X;
+    int y = get_global_id(1);
+    
+    float cy = Y0 + (float)y * DY;
+    
+    float cx[COARSE_X];
+    float zx[COARSE_X];
+    float zy[COARSE_X];
+    int iteration[COARSE_X];
+#ifdef PERIOD_DETECT
+    float saved_zx[COARSE_X];
+    float saved_zy[COARSE_X];
+#endif
+    
+    float cy2 = cy * cy;
+    #pragma unroll
+    for (int k = 0; k < COARSE_X; k++) {
+        cx[k] = X0 + (float)(x0 + k) * DX;
+        zx[k] = 0.0f;
+        zy[k] = 0.0f;
+        iteration[k] = 0;
+#ifdef PERIOD_DETECT
+        saved_zx[k] = 0.0f;
+        saved_zy[k] = 0.0f;
+#endif
+
+        // Points inside the main cardioid or the period-2 bulb never escape:
+        // count them as max_iterations and start z outside the escape radius
+        // so the loop below never touches them
+        float q = (cx[k] - 0.25f) * (cx[k] - 0.25f) + cy2;
+        if (q * (q + (cx[k] - 0.25f)) <= 0.25f * cy2
+            || (cx[k] + 1.0f) * (cx[k] + 1.0f) + cy2 <= 0.0625f) {
+            zx[k] = 4.0f;
+            iteration[k] = MAX_ITER;
+        }
+    }
+    
+    // An escaped pixel is no longer updated, so it stays escaped
+    for (int i = 0; i < MAX_ITER; i++) {
+        int active = 0;
+        #pragma unroll
+        for (int k = 0; k < COARSE_X; k++) {
+            if ((zx[k] * zx[k] + zy[k] * zy[k]) <= 4.0f) {
+                float xtemp = zx[k] * zx[k] - zy[k] * zy[k] + cx[k];
+                zy[k] = 2.0f * zx[k] * zy[k] + cy;
+                zx[k] = xtemp;
+                iteration[k]++;
+                active = 1;
+#ifdef PERIOD_DETECT
+                // z came back to the snapshot: the orbit is periodic, the
+                // point bounded; finish it like a cardioid point
+                if (zx[k] == saved_zx[k] && zy[k] == saved_zy[k]) {
+                    zx[k] = 4.0f;
+                    iteration[k] = MAX_ITER;
+                } else if (iteration[k] % PERIOD_CHECK_INTERVAL == 0) {
+                    saved_zx[k] = zx[k];
+                    saved_zy[k] = zy[k];
+                }
+#endif
+            }
+        }
+        if (!active) break;
+    }
+    
+    #pragma unroll
+    for (int k = 0; k < COARSE_X; k++)
+        output[y * pitch + x0 + k] = (uchar)(iteration[k] - 1);
+}
+"""
+
+# Largest iteration count the uchar output (count - 1) can hold
+MAX_ITERATIONS_UCHAR = 256
+
+
+def kernel_defines(width, height, max_iterations, coarse_x, period_detect=True):
+    """
+    Return the -D compiler options that specialize the kernel for one image.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        max_iterations: Maximum number of iterations
+        coarse_x: Pixels per work-item along x
+        period_detect: Build the kernel with periodicity detection
+
+    Returns:
+        List of compiler option strings
+    """
+    defines = [
+        f"-DCOARSE_X={coarse_x}",
+        "-DX0=-2.5f",
+        "-DY0=-1.0f",
+        f"-DDX={3.5 / (width - 1):.9e}f",
+        f"-DDY={2.0 / (height - 1):.9e}f",
+        f"-DMAX_ITER={max_iterations}",
+    ]
+    if period_detect:
+        defines.append("-DPERIOD_DETECT")
+    return defines
@@ -125,7 +125,7 @@ func runMetal4brotOptimized(width: Int, height: Int, maxIterations: Int) -> Doub
     return elapsed
 }
 
-func runMetal4brot(width: Int, height: Int, maxIterations: Int) -> [[UInt16]] {
+func runMetal4brot(width: Int, height: Int, maxIterations: Int) -> MTLBuffer {
     initializeMetal()
     
     guard let device = cachedDevice,
@@ -173,21 +173,12 @@ func runMetal4brot(width: Int, height: Int, maxIterations: Int) -> [[UInt16]] {
     commandBuffer.commit()
     commandBuffer.waitUntilCompleted()
     
-    let outputPointer = outputBuffer.contents().bindMemory(to: UInt16.self, capacity: width * height)
-    var result = [[UInt16]](repeating: [UInt16](repeating: 0, count: width), count: height)
-    
-    for y in 0..<height {
-        for x in 0..<width {
-            result[y][x] = outputPointer[y * width + x]
-        }
-    }
-    
-    return result
+    // The shared buffer is read directly by the caller, no copy into Swift arrays
+    return outputBuffer
 }
 
-func saveMandelbrotImage(_ data: [[UInt16]], maxIterations: Int, filename: String) {
-    let height = data.count
-    let width = data[0].count
+func saveMandelbrotImage(_ buffer: MTLBuffer, width: Int, height: Int, maxIterations: Int, filename: String) {
+    let data = buffer.contents().bindMemory(to: UInt16.self, capacity: width * height)
     
     let colorSpace = CGColorSpaceCreateDeviceRGB()
     let bitmapInfo = CGBitmapInfo(rawValue: CGImageAlphaInfo.noneSkipLast.rawValue)
@@ -196,7 +187,7 @@ func saveMandelbrotImage(_ data: [[UInt16]], maxIterations: Int, filename: Strin
     
     for y in 0..<height {
         for x in 0..<width {
-            let value = data[y][x]
+            let value = data[y * width + x]
             let offset = (y * width + x) * 4
             
             if value == maxIterations {
@@ -284,7 +275,7 @@ if CommandLine.arguments.count > 1 && CommandLine.arguments[1] == "benchmark" {
     // Generate image
     print("\nGenerating image...")
     let result = runMetal4brot(width: width, height: height, maxIterations: maxIterations)
-    saveMandelbrotImage(result, maxIterations: maxIterations, filename: "metal4brot.png")
+    saveMandelbrotImage(result, width: width, height: height, maxIterations: maxIterations, filename: "metal4brot.png")
 } else {
     print("Usage: swift metal4brot_optimized.swift benchmark")
 }
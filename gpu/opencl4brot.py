@@ -5,10 +5,21 @@ Comparison implementation to Metal 4 version
 """
 
 import numpy as np
+import os
 import shutil
 import subprocess
 import sys
 
+try:
+    from gpu.mandelbrot_kernel import (
+        KERNEL_SOURCE,
+        MAX_ITERATIONS_UCHAR,
+        kernel_defines,
+    )
+except ImportError:
+    # Run as a script (python gpu/opencl4brot.py or from inside gpu/)
+    from mandelbrot_kernel import KERNEL_SOURCE, MAX_ITERATIONS_UCHAR, kernel_defines
+
 def install_with_uv_or_pip(package: str) -> bool:
     """
     Try to install a Python package using 'uv' if available, otherwise fallback to pip.
@@ -46,6 +57,140 @@ except ImportError:
 if not OPENCL_AVAILABLE:
     print("Warning: PyOpenCL not available. Install with: uv install pyopencl or pip install pyopencl")
 
+# Pixels per work-item along x (thread coarsening). Passed to the kernel
+# build as -DCOARSE_X, OPENCL_COARSE_X overrides it for tuning sweeps.
+COARSE_X = int(os.environ.get("OPENCL_COARSE_X", "4"))
+
+# Periodicity detection (-DPERIOD_DETECT): a pixel whose z comes back to a
+# snapshot taken every PERIOD_CHECK_INTERVAL iterations is bounded.
+# OPENCL_PERIOD_DETECT=0 builds the kernel without it.
+PERIOD_DETECT = os.environ.get("OPENCL_PERIOD_DETECT", "1") != "0"
+
+# Compiler options for the kernel build. The escape-time loop only compares
+# |z|^2 against 4, so relaxed IEEE semantics (reassociation, fused
+# multiply-add, no signed zeros, flushed denormals) do not affect the result
+BUILD_OPTIONS = [
+    "-cl-fast-relaxed-math",
+    "-cl-mad-enable",
+    "-cl-no-signed-zeros",
+    "-cl-denorms-are-zero",
+]
+
+# OpenCL objects are expensive to create (the program build alone takes tens
+# to hundreds of ms), so they are built once and reused across calls; the
+# kernels are cached per (width, height, max_iterations).
+# PyOpenCL additionally caches compiled program binaries on disk.
+_ctx = None
+_queue = None
+_kernels = {}
+_output_buf = None
+_output_nbytes = 0
+
+
+def _select_local_size(kernel, device):
+    """
+    Choose the work-group size for the mandelbrot kernel.
+
+    16x16 (256 work-items) is a multiple of both the 32-wide NVIDIA warps
+    and the 64-wide AMD wavefronts; devices that cannot run 256 work-items
+    per group get 8x8. OPENCL_LOCAL_SIZE=WxH overrides the choice.
+
+    Args:
+        kernel: Built OpenCL kernel
+        device: OpenCL device the kernel runs on
+
+    Returns:
+        Tuple (local_x, local_y)
+    """
+    override = os.environ.get("OPENCL_LOCAL_SIZE")
+    if override:
+        local_x, local_y = override.lower().split("x")
+        return int(local_x), int(local_y)
+
+    max_size = min(device.max_work_group_size,
+                   kernel.get_work_group_info(cl.kernel_work_group_info.WORK_GROUP_SIZE, device))
+    return (16, 16) if max_size >= 256 else (8, 8)
+
+
+def _get_cl():
+    """
+    Create (once) and return the OpenCL context and command queue.
+
+    Returns:
+        Tuple of (context, command_queue)
+    """
+    global _ctx, _queue
+
+    if _ctx is None:
+        platforms = cl.get_platforms()
+        if not platforms:
+            raise RuntimeError("No OpenCL platforms found")
+
+        # Try to find GPU device, fall back to any device
+        ctx = None
+        for platform in platforms:
+            try:
+                ctx = cl.Context(dev_type=cl.device_type.GPU, properties=[(cl.context_properties.PLATFORM, platform)])
+                break
+            except:
+                pass
+
+        if ctx is None:
+            # Fall back to any available device
+            ctx = cl.create_some_context(interactive=False)
+
+        _ctx = ctx
+        _queue = cl.CommandQueue(ctx)
+
+    return _ctx, _queue
+
+
+def _get_kernel(ctx, width, height, max_iterations):
+    """
+    Build (once per image size) and return the mandelbrot kernel and its local size.
+
+    Args:
+        ctx: OpenCL context
+        width: Image width in pixels
+        height: Image height in pixels
+        max_iterations: Maximum number of iterations
+
+    Returns:
+        Tuple of (kernel, local_size)
+    """
+    key = (width, height, max_iterations)
+    if key not in _kernels:
+        options = BUILD_OPTIONS + kernel_defines(width, height, max_iterations,
+                                                 COARSE_X, PERIOD_DETECT)
+        prg = cl.Program(ctx, KERNEL_SOURCE).build(options=options)
+
+        kernel = cl.Kernel(prg, "mandelbrot")
+        _kernels[key] = (kernel, _select_local_size(kernel, ctx.devices[0]))
+
+    return _kernels[key]
+
+
+def _get_output_buffer(ctx, nbytes):
+    """
+    Return a pinned output buffer of at least nbytes, reused across calls.
+
+    Args:
+        ctx: OpenCL context
+        nbytes: Required buffer size in bytes
+
+    Returns:
+        OpenCL buffer allocated with ALLOC_HOST_PTR
+    """
+    global _output_buf, _output_nbytes
+
+    # Allocated in host-visible (pinned) memory, so the kernel writes where
+    # the host can read it without a staging copy; grown only when needed
+    if nbytes > _output_nbytes:
+        _output_buf = cl.Buffer(ctx, cl.mem_flags.WRITE_ONLY | cl.mem_flags.ALLOC_HOST_PTR, nbytes)
+        _output_nbytes = nbytes
+    return _output_buf
+
+
 def run_opencl4brot(width, height, max_iterations):
     """
     Compute Mandelbrot set using OpenCL GPU acceleration
@@ -60,81 +205,36 @@ def run_opencl4brot(width, height, max_iterations):
     """
     if not OPENCL_AVAILABLE:
         raise RuntimeError("PyOpenCL is not installed. Install with: uv install pyopencl (or: pip install pyopencl)")
+    if max_iterations > MAX_ITERATIONS_UCHAR:
+        raise ValueError(f"max_iterations must be <= {MAX_ITERATIONS_UCHAR} for the 8-bit output")
 
-    # OpenCL kernel source
-    kernel_source = """
-    __kernel void mandelbrot(__global ushort *output,
-                            const int width,
-                            const int height,
-                            const int maxIterations)
-    {
-        int x = get_global_id(0);
-        int y = get_global_id(1);
-        
-        if (x >= width || y >= height) return;
-        
-        float cx = -2.5f + ((float)x * 3.5f / (float)(width - 1));
-        float cy = -1.0f + ((float)y * 2.0f / (float)(height - 1));
-        
-        float zx = 0.0f;
-        float zy = 0.0f;
-        int iteration = 0;
-        
-        while (iteration < maxIterations && (zx * zx + zy * zy) <= 4.0f) {
-            float xtemp = zx * zx - zy * zy + cx;
-            zy = 2.0f * zx * zy + cy;
-            zx = xtemp;
-            iteration++;
-        }
-        
-        output[y * width + x] = (ushort)iteration;
-    }
-    """
-    
-    # Initialize OpenCL
-    platforms = cl.get_platforms()
-    if not platforms:
-        raise RuntimeError("No OpenCL platforms found")
-    
-    # Try to find GPU device, fall back to any device
-    ctx = None
-    for platform in platforms:
-        try:
-            ctx = cl.Context(dev_type=cl.device_type.GPU, properties=[(cl.context_properties.PLATFORM, platform)])
-            break
-        except:
-            pass
-    
-    if ctx is None:
-        # Fall back to any available device
-        ctx = cl.create_some_context(interactive=False)
-    
-    queue = cl.CommandQueue(ctx)
-    
-    # Build program
-    prg = cl.Program(ctx, kernel_source).build()
-    
-    # Create output buffer
-    output = np.zeros(width * height, dtype=np.uint16)
-    output_buf = cl.Buffer(ctx, cl.mem_flags.WRITE_ONLY, output.nbytes)
-    
-    # Execute kernel
-    global_size = (width, height)
-    local_size = None  # Let OpenCL choose optimal local size
-    
-    prg.mandelbrot(queue, global_size, local_size,
-                   output_buf,
-                   np.int32(width),
-                   np.int32(height),
-                   np.int32(max_iterations))
+    ctx, queue = _get_cl()
+    kernel, local_size = _get_kernel(ctx, width, height, max_iterations)
+
+    # One work-item per COARSE_X pixels of a row. The global size is padded
+    # up to a multiple of the local size and the output buffer to match, so
+    # the extra work-items write into the padding instead of being skipped
+    work_items_x = -(-width // COARSE_X)
+    global_size = (-(-work_items_x // local_size[0]) * local_size[0],
+                   -(-height // local_size[1]) * local_size[1])
+    padded_width = global_size[0] * COARSE_X
+    padded_height = global_size[1]
+
+    nbytes = padded_width * padded_height * np.dtype(np.uint8).itemsize
+    output_buf = _get_output_buffer(ctx, nbytes)
     
-    # Read results
-    cl.enqueue_copy(queue, output, output_buf).wait()
+    kernel.set_args(output_buf,
+                    np.int32(padded_width))
+    cl.enqueue_nd_range_kernel(queue, kernel, global_size, local_size)
     
-    # Reshape to 2D array
-    result = output.reshape(height, width)
+    # Map the results into host memory (blocking, after the kernel on the
+    # in-order queue) and copy them out before the mapping is released
+    mapped, _ = cl.enqueue_map_buffer(queue, output_buf, cl.map_flags.READ, 0,
+                                      (padded_height, padded_width), np.uint8)
+    with mapped.base:
+        result = mapped[:height, :width].astype(np.uint16) + 1
     
-    return result.tolist()
+    return result
 
 def save_image(data, filename="opencl4brot.png"):
     """Save iteration data as PNG image"""
@@ -152,28 +252,18 @@ def save_image(data, filename="opencl4brot.png"):
             print("Warning: PIL not available. Install with: uv install pillow or pip install pillow")
             return
 
-    data_array = np.array(data, dtype=np.uint16)
+    data_array = np.asarray(data, dtype=np.uint16)
     height, width = data_array.shape
     max_iter = data_array.max()
 
-    # Create RGB image with color gradient
-    img = Image.new('RGB', (width, height))
-    pixels = img.load()
-
-    for y in range(height):
-        for x in range(width):
-            iteration = data_array[y, x]
-            if iteration == max_iter:
-                # Black for points in the set
-                pixels[x, y] = (0, 0, 0)
-            else:
-                # Color gradient for points outside
-                hue = int(255 * iteration / max_iter)
-                r = (hue * 9) % 256
-                g = (hue * 7) % 256
-                b = (hue * 5) % 256
-                pixels[x, y] = (r, g, b)
+    # Color gradient for points outside, computed for all pixels at once
+    hue = 255 * data_array // max(int(max_iter), 1)
+    rgb = np.stack([(hue * 9) % 256, (hue * 7) % 256, (hue * 5) % 256], axis=-1).astype(np.uint8)
+
+    # Black for points in the set
+    rgb[data_array == max_iter] = 0
 
+    img = Image.fromarray(rgb, 'RGB')
     img.save(filename)
     print(f"Saved image to {filename}")
 
@@ -10,6 +10,10 @@ License: MIT
 GitHub: https://github.com/Zeutschler/sql-mandelbrot-benchmark
 """
 
+import argparse
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+
 from utils import print_header, print_results, run_benchmark, save_mandelbrot_image
 
 # Mandelbrot set configuration
@@ -17,46 +21,109 @@ WIDTH = 1400
 HEIGHT = 800
 MAX_ITERATIONS = 256
 
-# Benchmark registry: (name, module, function)
+# Benchmark registry: (name, module, function); modules may be dotted paths
 BENCHMARKS = [
     ("NumPy (Vectorized)", "numpybrot", "run_numpybrot"),
     ("ArrowDatafusion", "arrow_datafusion", "run_arrow_datafusion"),
     ("DuckDB (SQL)", "duckbrot", "run_duckbrot"),
     ("FastPybrot", "fastpybrot", "run_pybrot"),
     ("FasterPybrot", "fasterpybrot", "run_pybrot"),
+    ("Numba (JIT)", "numbabrot", "run_numbabrot"),
     ("Pure Python", "pybrot", "run_pybrot"),
+    ("SimdBrot (AVX2/AVX-512)", "simdbrot", "run_simdbrot"),
     ("SQLite", "sqlitebrot", "run_sqlitebrot"),
+    # Not yet verified on real PyCUDA/NVIDIA hardware, skipped without PyCUDA
+    ("CUDA (PyCUDA)", "gpu.cuda4brot", "run_cuda4brot"),
     # Add more benchmarks here:
     # ("PostgreSQL", "postgresqlbrot", "run_postgresqlbrot"),
     # ("MySQL", "mysqlbrot", "run_mysqlbrot"),
 ]
 
 
+def _run_one(name, module_name, func_name):
+    """
+    Import one benchmark module and run its compute function.
+
+    Top-level so that it can be pickled into a worker process.
+
+    Args:
+        name: Benchmark name
+        module_name: Module to import
+        func_name: Compute function in that module
+
+    Returns:
+        Tuple of (result, elapsed_ms)
+    """
+    module = importlib.import_module(module_name)
+    func = getattr(module, func_name)
+    return run_benchmark(name, func, WIDTH, HEIGHT, MAX_ITERATIONS)
+
+
+def _collect(results, name, module_name, get_result):
+    """
+    Fetch one benchmark outcome, record its timing and save its image.
+
+    Args:
+        results: List of (name, elapsed_ms) tuples to append to
+        name: Benchmark name
+        module_name: Benchmark module, used for the image filename
+        get_result: Callable returning the (result, elapsed_ms) of the run
+    """
+    try:
+        result, elapsed_ms = get_result()
+        results.append((name, elapsed_ms))
+
+        # Save the generated image
+        if result is not None:
+            filename = f"{module_name.rsplit('.', 1)[-1]}.png"
+            save_mandelbrot_image(result, MAX_ITERATIONS, filename)
+
+    except ImportError as e:
+        print(f"\n⊘ {name} benchmark not available: {e}")
+    except AttributeError as e:
+        print(f"\n⊘ {name} benchmark missing function: {e}")
+
+
 def main():
     """Run all available benchmarks."""
+    parser = argparse.ArgumentParser(description="Mandelbrot set benchmark suite")
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="run the benchmarks concurrently in worker processes "
+        "(shorter wall-clock time, but timings are not isolated)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="number of worker processes with --parallel (default: 2)",
+    )
+    args = parser.parse_args()
+
     print_header(WIDTH, HEIGHT, MAX_ITERATIONS)
 
     results = []
 
-    # Run all available benchmarks
-    for name, module_name, func_name in BENCHMARKS:
-        try:
-            module = __import__(module_name)
-            func = getattr(module, func_name)
-            result, elapsed_ms = run_benchmark(
-                name, func, WIDTH, HEIGHT, MAX_ITERATIONS
+    if args.parallel:
+        # Timing stays inside each worker; results are collected in
+        # registry order so the summary table is stable
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = [
+                executor.submit(_run_one, name, module_name, func_name)
+                for name, module_name, func_name in BENCHMARKS
+            ]
+            for (name, module_name, _), future in zip(BENCHMARKS, futures):
+                _collect(results, name, module_name, future.result)
+    else:
+        # Run all available benchmarks one after the other
+        for name, module_name, func_name in BENCHMARKS:
+            _collect(
+                results,
+                name,
+                module_name,
+                lambda: _run_one(name, module_name, func_name),
             )
-            results.append((name, elapsed_ms))
-
-            # Save the generated image
-            if result is not None:
-                filename = f"{module_name}.png"
-                save_mandelbrot_image(result, MAX_ITERATIONS, filename)
-
-        except ImportError as e:
-            print(f"\n⊘ {name} benchmark not available: {e}")
-        except AttributeError as e:
-            print(f"\n⊘ {name} benchmark missing function: {e}")
 
     # Print summary
     print_results(results, WIDTH, HEIGHT, MAX_ITERATIONS)
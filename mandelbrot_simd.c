@@ -0,0 +1,220 @@
+/*
+ * Mandelbrot SIMD - Explicit AVX2/AVX-512 float32 row kernels for SimdBrot
+ *
+ * Each kernel computes one image row. In float32 an AVX2 register holds 8
+ * pixels and an AVX-512 register 16. The escape test yields a per-lane
+ * mask: the counters of the active lanes are incremented under that mask
+ * and a vector is finished as soon as no lane is active.
+ *
+ * All variants are compiled into one library via target attributes, so no
+ * -march flag is needed; mandel_simd_level() reports which one the running
+ * CPU supports and the caller picks it once at import.
+ *
+ * Build with: make simd
+ *
+ * License: MIT
+ * GitHub: https://github.com/Zeutschler/sql-mandelbrot-benchmark
+ */
+
+#include <stdint.h>
+
+#if defined(__x86_64__) || defined(__i386__)
+#include <immintrin.h>
+#define MANDEL_X86 1
+#endif
+
+/* Iterations between two snapshots of z for the periodicity check */
+#define PERIOD_CHECK_INTERVAL 20
+
+/* Points inside the main cardioid or the period-2 bulb never escape */
+static int in_cardioid_or_bulb(float cx, float cy)
+{
+    float cy2 = cy * cy;
+    float q = (cx - 0.25f) * (cx - 0.25f) + cy2;
+    return q * (q + (cx - 0.25f)) <= 0.25f * cy2 || (cx + 1.0f) * (cx + 1.0f) + cy2 <= 0.0625f;
+}
+
+void mandel_row_scalar(uint16_t *out, int width, float cy, float x0, float dx, int max_iter)
+{
+    for (int x = 0; x < width; x++) {
+        float cx = x0 + (float)x * dx;
+        if (in_cardioid_or_bulb(cx, cy)) {
+            out[x] = (uint16_t)max_iter;
+            continue;
+        }
+        float zr = 0.0f;
+        float zi = 0.0f;
+        float saved_zr = 0.0f;
+        float saved_zi = 0.0f;
+        int i = 0;
+        while (i < max_iter) {
+            float zr2 = zr * zr;
+            float zi2 = zi * zi;
+            if (zr2 + zi2 > 4.0f)
+                break;
+            zi = 2.0f * zr * zi + cy;
+            zr = zr2 - zi2 + cx;
+            i++;
+            /* z came back to the snapshot: the orbit is periodic, the point bounded */
+            if (zr == saved_zr && zi == saved_zi) {
+                i = max_iter;
+                break;
+            }
+            if (i % PERIOD_CHECK_INTERVAL == 0) {
+                saved_zr = zr;
+                saved_zi = zi;
+            }
+        }
+        out[x] = (uint16_t)i;
+    }
+}
+
+#ifdef MANDEL_X86
+
+__attribute__((target("avx2,fma")))
+void mandel_row_avx2(uint16_t *out, int width, float cy, float x0, float dx, int max_iter)
+{
+    const __m256 lane_idx = _mm256_set_ps(7.0f, 6.0f, 5.0f, 4.0f, 3.0f, 2.0f, 1.0f, 0.0f);
+    const __m256 x0_v = _mm256_set1_ps(x0);
+    const __m256 dx_v = _mm256_set1_ps(dx);
+    const __m256 ci = _mm256_set1_ps(cy);
+    const __m256 four = _mm256_set1_ps(4.0f);
+    const __m256 quarter = _mm256_set1_ps(0.25f);
+    const __m256 sixteenth = _mm256_set1_ps(0.0625f);
+    const __m256 one = _mm256_set1_ps(1.0f);
+    const __m256 ci2 = _mm256_mul_ps(ci, ci);
+    const __m256i max_v = _mm256_set1_epi32(max_iter);
+    int x = 0;
+
+    for (; x + 8 <= width; x += 8) {
+        __m256 cr = _mm256_fmadd_ps(_mm256_add_ps(_mm256_set1_ps((float)x), lane_idx), dx_v, x0_v);
+        __m256 zr = _mm256_setzero_ps();
+        __m256 zi = _mm256_setzero_ps();
+
+        /* Lanes inside the cardioid or period-2 bulb start at max_iter, inactive */
+        __m256 xq = _mm256_sub_ps(cr, quarter);
+        __m256 q = _mm256_fmadd_ps(xq, xq, ci2);
+        __m256 xb = _mm256_add_ps(cr, one);
+        __m256 inside = _mm256_or_ps(
+            _mm256_cmp_ps(_mm256_mul_ps(q, _mm256_add_ps(q, xq)), _mm256_mul_ps(quarter, ci2), _CMP_LE_OQ),
+            _mm256_cmp_ps(_mm256_fmadd_ps(xb, xb, ci2), sixteenth, _CMP_LE_OQ));
+        __m256 active = _mm256_andnot_ps(inside, _mm256_castsi256_ps(_mm256_set1_epi32(-1)));
+        __m256i iters = _mm256_and_si256(_mm256_castps_si256(inside), max_v);
+        __m256 saved_zr = zr;
+        __m256 saved_zi = zi;
+
+        for (int i = 0; i < max_iter; i++) {
+            __m256 zi2 = _mm256_mul_ps(zi, zi);
+            __m256 mag2 = _mm256_fmadd_ps(zr, zr, zi2);
+            /* Escaped lanes stay inactive even if |z| drops back below 2 */
+            active = _mm256_and_ps(active, _mm256_cmp_ps(mag2, four, _CMP_LE_OQ));
+            if (_mm256_movemask_ps(active) == 0)
+                break;
+            /* Active lanes hold -1 in the mask, so subtracting it counts them up */
+            iters = _mm256_sub_epi32(iters, _mm256_castps_si256(active));
+            __m256 zr2_minus_zi2 = _mm256_fmsub_ps(zr, zr, zi2);
+            zi = _mm256_fmadd_ps(_mm256_add_ps(zr, zr), zi, ci);
+            zr = _mm256_add_ps(zr2_minus_zi2, cr);
+
+            /* Lanes whose z came back to the snapshot are periodic, hence bounded */
+            __m256 cycled = _mm256_and_ps(active, _mm256_and_ps(_mm256_cmp_ps(zr, saved_zr, _CMP_EQ_OQ),
+                                                                _mm256_cmp_ps(zi, saved_zi, _CMP_EQ_OQ)));
+            if (_mm256_movemask_ps(cycled) != 0) {
+                iters = _mm256_blendv_epi8(iters, max_v, _mm256_castps_si256(cycled));
+                active = _mm256_andnot_ps(cycled, active);
+            }
+            if ((i + 1) % PERIOD_CHECK_INTERVAL == 0) {
+                saved_zr = zr;
+                saved_zi = zi;
+            }
+        }
+
+        /* Narrow the 8 int32 counters to uint16 and store them at once */
+        __m128i packed = _mm_packus_epi32(_mm256_castsi256_si128(iters),
+                                          _mm256_extracti128_si256(iters, 1));
+        _mm_storeu_si128((__m128i *)(out + x), packed);
+    }
+
+    /* Remaining pixels that do not fill a whole vector */
+    if (x < width)
+        mandel_row_scalar(out + x, width - x, cy, x0 + (float)x * dx, dx, max_iter);
+}
+
+__attribute__((target("avx512f")))
+void mandel_row_avx512(uint16_t *out, int width, float cy, float x0, float dx, int max_iter)
+{
+    const __m512 lane_idx = _mm512_set_ps(15.0f, 14.0f, 13.0f, 12.0f, 11.0f, 10.0f, 9.0f, 8.0f,
+                                          7.0f, 6.0f, 5.0f, 4.0f, 3.0f, 2.0f, 1.0f, 0.0f);
+    const __m512 x0_v = _mm512_set1_ps(x0);
+    const __m512 dx_v = _mm512_set1_ps(dx);
+    const __m512 ci = _mm512_set1_ps(cy);
+    const __m512 four = _mm512_set1_ps(4.0f);
+    const __m512i one = _mm512_set1_epi32(1);
+    const __m512i max_v = _mm512_set1_epi32(max_iter);
+    const __m512 quarter = _mm512_set1_ps(0.25f);
+    const __m512 sixteenth = _mm512_set1_ps(0.0625f);
+    const __m512 one_ps = _mm512_set1_ps(1.0f);
+    const __m512 ci2 = _mm512_mul_ps(ci, ci);
+
+    for (int x = 0; x < width; x += 16) {
+        /* Lanes past the end of the row are disabled, no scalar tail needed */
+        __mmask16 lanes = width - x >= 16 ? 0xffff : (__mmask16)((1u << (width - x)) - 1);
+        __m512 cr = _mm512_fmadd_ps(_mm512_add_ps(_mm512_set1_ps((float)x), lane_idx), dx_v, x0_v);
+        __m512 zr = _mm512_setzero_ps();
+        __m512 zi = _mm512_setzero_ps();
+
+        /* Lanes inside the cardioid or period-2 bulb start at max_iter, masked off */
+        __m512 xq = _mm512_sub_ps(cr, quarter);
+        __m512 q = _mm512_fmadd_ps(xq, xq, ci2);
+        __m512 xb = _mm512_add_ps(cr, one_ps);
+        __mmask16 inside = _mm512_cmp_ps_mask(_mm512_mul_ps(q, _mm512_add_ps(q, xq)),
+                                              _mm512_mul_ps(quarter, ci2), _CMP_LE_OQ)
+                         | _mm512_cmp_ps_mask(_mm512_fmadd_ps(xb, xb, ci2), sixteenth, _CMP_LE_OQ);
+        __m512i iters = _mm512_maskz_mov_epi32(inside, max_v);
+        __mmask16 active = lanes & (__mmask16)~inside;
+        __m512 saved_zr = zr;
+        __m512 saved_zi = zi;
+
+        for (int i = 0; i < max_iter; i++) {
+            __m512 zi2 = _mm512_mul_ps(zi, zi);
+            __m512 mag2 = _mm512_fmadd_ps(zr, zr, zi2);
+            active = _mm512_mask_cmp_ps_mask(active, mag2, four, _CMP_LE_OQ);
+            if (!active)
+                break;
+            iters = _mm512_mask_add_epi32(iters, active, iters, one);
+            __m512 zr2_minus_zi2 = _mm512_fmsub_ps(zr, zr, zi2);
+            zi = _mm512_fmadd_ps(_mm512_add_ps(zr, zr), zi, ci);
+            zr = _mm512_add_ps(zr2_minus_zi2, cr);
+
+            /* Lanes whose z came back to the snapshot are periodic, hence bounded */
+            __mmask16 cycled = _mm512_mask_cmp_ps_mask(active, zr, saved_zr, _CMP_EQ_OQ)
+                             & _mm512_cmp_ps_mask(zi, saved_zi, _CMP_EQ_OQ);
+            if (cycled) {
+                iters = _mm512_mask_mov_epi32(iters, cycled, max_v);
+                active &= (__mmask16)~cycled;
+            }
+            if ((i + 1) % PERIOD_CHECK_INTERVAL == 0) {
+                saved_zr = zr;
+                saved_zi = zi;
+            }
+        }
+
+        /* Narrow the 16 counters to uint16 and store them in one instruction */
+        _mm512_mask_cvtepi32_storeu_epi16(out + x, lanes, iters);
+    }
+}
+
+#endif
+
+/* 2 if the CPU supports AVX-512F, 1 for AVX2 with FMA, 0 otherwise */
+int mandel_simd_level(void)
+{
+#ifdef MANDEL_X86
+    __builtin_cpu_init();
+    if (__builtin_cpu_supports("avx512f"))
+        return 2;
+    if (__builtin_cpu_supports("avx2") && __builtin_cpu_supports("fma"))
+        return 1;
+#endif
+    return 0;
+}
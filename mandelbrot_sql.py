@@ -0,0 +1,94 @@
+"""
+Mandelbrot SQL - Shared Recursive CTE for the SQL Engines
+
+The Mandelbrot query used by DuckBrot and the DataFusion benchmark. The
+SQL is written once with {width}, {height} and {max_iterations}
+placeholders and only uses syntax both engines understand.
+
+Author: Thomas Zeutschler
+License: MIT
+GitHub: https://github.com/Zeutschler/sql-mandelbrot-benchmark
+"""
+
+from functools import lru_cache
+
+# Recursive CTE computing the Mandelbrot set. The result holds one
+# (x, y, depth) row per pixel in no particular order.
+SQL_TEMPLATE = """
+WITH RECURSIVE
+  pixels AS (
+    SELECT
+      x,
+      y,
+      -2.5 + (x::DOUBLE * 3.5 / ({width} - 1)::DOUBLE) AS cx,
+      -1.0 + (y::DOUBLE * 2.0 / ({height} - 1)::DOUBLE) AS cy
+    FROM (
+      -- (n - n % width) / width is an exact integer under both integer and
+      -- floating point division, DuckDB and DataFusion differ on /
+      SELECT
+        (n % {width})::INTEGER AS x,
+        ((n - n % {width}) / {width})::INTEGER AS y
+      FROM
+        generate_series(0, {width} * {height} - 1) AS t(n)
+    ) AS grid
+  ),
+  mandelbrot_iterations AS (
+    SELECT
+      x, y, cx, cy,
+      0.0::DOUBLE AS zx,
+      0.0::DOUBLE AS zy,
+      -- Points inside the main cardioid or the period-2 bulb never escape,
+      -- start them at max_iterations so they are never recursed on
+      CASE
+        WHEN ((cx - 0.25) * (cx - 0.25) + cy * cy)
+             * ((cx - 0.25) * (cx - 0.25) + cy * cy + (cx - 0.25)) <= 0.25 * cy * cy
+          OR (cx + 1.0) * (cx + 1.0) + cy * cy <= 0.0625
+        THEN {max_iterations}
+        ELSE 0
+      END AS iteration
+    FROM pixels
+
+    UNION ALL
+
+    SELECT
+      m.x,
+      m.y,
+      m.cx,
+      m.cy,
+      (m.zx * m.zx - m.zy * m.zy + m.cx)::DOUBLE AS zx,
+      (2.0 * m.zx * m.zy + m.cy)::DOUBLE AS zy,
+      m.iteration + 1 AS iteration
+    FROM mandelbrot_iterations m
+    WHERE
+      m.iteration < {max_iterations}
+      AND (m.zx * m.zx + m.zy * m.zy) <= 4.0
+  )
+-- Exactly one row per pixel fails the recursion condition: its last one.
+-- Filtering on that row replaces a GROUP BY over every iteration row.
+SELECT
+  x,
+  y,
+  iteration AS depth
+FROM mandelbrot_iterations
+WHERE
+  iteration >= {max_iterations}
+  OR (zx * zx + zy * zy) > 4.0
+"""
+
+
+@lru_cache(maxsize=None)
+def build_query(width, height, max_iterations):
+    """
+    Build the Mandelbrot query for one image size, cached per argument tuple.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        max_iterations: Maximum iterations per pixel
+
+    Returns:
+        SQL string with all placeholders filled in
+    """
+    return SQL_TEMPLATE.format(
+        width=int(width), height=int(height), max_iterations=int(max_iterations)
+    )
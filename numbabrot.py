@@ -0,0 +1,47 @@
+"""
+NumbaBrot - Numba JIT-compiled Mandelbrot Set Computation
+
+Runs the Numba kernel of FasterPyBrot on its own, without the optional C
+SIMD kernel taking precedence: the escape-time loop is compiled to native
+code and 128x128 tiles are distributed across all CPU cores.
+
+Requires Numba (`pip install numba`).
+
+Author: Ulrich Ludmann
+License: MIT
+GitHub: https://github.com/Zeutschler/sql-mandelbrot-benchmark
+"""
+
+from fasterpybrot import NUMBA_AVAILABLE, compute_mandelbrot_numba
+from utils import save_mandelbrot_image
+
+if not NUMBA_AVAILABLE:
+    raise ImportError("Numba is not installed, install it with `pip install numba`")
+
+
+def run_numbabrot(width, height, max_iterations):
+    """
+    Compute Mandelbrot set using the Numba-compiled kernel.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        max_iterations: Maximum iterations per pixel
+
+    Returns:
+        2D NumPy array of iteration counts
+    """
+    return compute_mandelbrot_numba(width, height, max_iterations)
+
+
+if __name__ == "__main__":
+    # Standalone execution
+    WIDTH = 1400
+    HEIGHT = 800
+    MAX_ITERATIONS = 256
+
+    print(
+        f"Computing Mandelbrot set with Numba ({WIDTH}x{HEIGHT}, max {MAX_ITERATIONS} iterations)..."
+    )
+    result = run_numbabrot(WIDTH, HEIGHT, MAX_ITERATIONS)
+    save_mandelbrot_image(result, MAX_ITERATIONS, "numbabrot.png")
@@ -1,9 +1,10 @@
 """
 NumPyBrot - Highly Optimized Mandelbrot Set Computation using NumPy
 
-This implementation uses loop unrolling and vectorized operations for maximum
-performance. It processes 4 iterations per loop cycle, uses separate real/imaginary
-arrays for better SIMD performance, and leverages CPU instruction-level parallelism.
+This implementation iterates only the pixels that have not escaped yet. Every
+few iterations the still-active pixels are gathered into compact 1-D arrays,
+so the memory traffic per iteration shrinks with the number of surviving
+pixels. Separate real/imaginary float32 arrays halve the bytes moved again.
 
 Author: Thomas Zeutschler
 License: MIT
@@ -11,15 +12,19 @@ GitHub: https://github.com/Zeutschler/sql-mandelbrot-benchmark
 """
 
 import numpy as np
-from utils import save_mandelbrot_image
+from utils import in_cardioid_or_bulb, save_mandelbrot_image
 
+# Number of iterations between two compactions of the active pixels
+COMPACT_INTERVAL = 32
 
-def compute_mandelbrot_unrolled(width, height, max_iterations):
+
+def compute_mandelbrot_compacted(width, height, max_iterations):
     """
-    Compute Mandelbrot set using manual loop unrolling for better performance.
+    Compute Mandelbrot set iterating only the still-active pixels.
 
-    This processes multiple iterations per loop cycle, reducing loop overhead
-    and allowing better CPU pipelining and instruction-level parallelism.
+    Escaped pixels are masked off every iteration and dropped from the
+    working arrays every COMPACT_INTERVAL iterations. An index map keeps
+    track of where each remaining pixel belongs in the output image.
 
     Args:
         width: Image width in pixels
@@ -29,82 +34,48 @@ def compute_mandelbrot_unrolled(width, height, max_iterations):
     Returns:
         2D NumPy array of iteration counts (height x width)
     """
-    # Create coordinate arrays
+    # Create flat coordinate arrays, row by row
     x = np.linspace(-2.5, 1.0, width, dtype=np.float64)
     y = np.linspace(-1.0, 1.0, height, dtype=np.float64)
-    cx, cy = np.meshgrid(x, y)
-    c = cx + 1j * cy
+    cr = np.tile(x, height).astype(np.float32)
+    ci = np.repeat(y, width).astype(np.float32)
 
     # Use separate real and imaginary arrays for better performance
-    zr = np.zeros(c.shape, dtype=np.float64)
-    zi = np.zeros(c.shape, dtype=np.float64)
-    cr = c.real
-    ci = c.imag
+    zr = np.zeros(cr.shape, dtype=np.float32)
+    zi = np.zeros(cr.shape, dtype=np.float32)
+
+    iterations = np.full(width * height, max_iterations, dtype=np.uint16)
+    pos = np.arange(width * height)
 
-    iterations = np.full(c.shape, max_iterations, dtype=np.uint16)
-    mask = np.ones(c.shape, dtype=bool)
+    # Points inside the main cardioid or the period-2 bulb keep
+    # max_iterations and are dropped by the compaction before iteration 0
+    mask = ~in_cardioid_or_bulb(cr, ci)
 
     # Suppress overflow warnings (expected for escaped points)
     with np.errstate(over='ignore', invalid='ignore'):
-        # Unroll 4 iterations at a time
-        unroll_factor = 4
-        for i in range(0, max_iterations, unroll_factor):
-            if not mask.any():
-                break
-
-            # Iteration 1
-            if i < max_iterations:
-                zr2 = zr * zr
-                zi2 = zi * zi
-                zi = 2.0 * zr * zi + ci
-                zr = zr2 - zi2 + cr
-
-                mag2 = zr * zr + zi * zi
-                escaped = mag2 > 4.0
-                newly_escaped = escaped & mask
-                iterations[newly_escaped] = i
-                mask &= ~escaped
-
-            # Iteration 2
-            if i + 1 < max_iterations and mask.any():
-                zr2 = zr * zr
-                zi2 = zi * zi
-                zi = 2.0 * zr * zi + ci
-                zr = zr2 - zi2 + cr
-
-                mag2 = zr * zr + zi * zi
-                escaped = mag2 > 4.0
-                newly_escaped = escaped & mask
-                iterations[newly_escaped] = i + 1
-                mask &= ~escaped
-
-            # Iteration 3
-            if i + 2 < max_iterations and mask.any():
-                zr2 = zr * zr
-                zi2 = zi * zi
-                zi = 2.0 * zr * zi + ci
-                zr = zr2 - zi2 + cr
-
-                mag2 = zr * zr + zi * zi
-                escaped = mag2 > 4.0
-                newly_escaped = escaped & mask
-                iterations[newly_escaped] = i + 2
-                mask &= ~escaped
-
-            # Iteration 4
-            if i + 3 < max_iterations and mask.any():
-                zr2 = zr * zr
-                zi2 = zi * zi
-                zi = 2.0 * zr * zi + ci
-                zr = zr2 - zi2 + cr
-
-                mag2 = zr * zr + zi * zi
-                escaped = mag2 > 4.0
-                newly_escaped = escaped & mask
-                iterations[newly_escaped] = i + 3
-                mask &= ~escaped
-
-    return iterations
+        for i in range(max_iterations):
+            if i % COMPACT_INTERVAL == 0:
+                idx = np.flatnonzero(mask)
+                if idx.size == 0:
+                    break
+                zr = zr[idx]
+                zi = zi[idx]
+                cr = cr[idx]
+                ci = ci[idx]
+                pos = pos[idx]
+                mask = mask[idx]
+
+            zr2 = zr * zr
+            zi2 = zi * zi
+            zi = 2.0 * zr * zi + ci
+            zr = zr2 - zi2 + cr
+
+            # A pixel that escapes after update i + 1 has done i + 1 iterations
+            escaped = (zr * zr + zi * zi > 4.0) & mask
+            iterations[pos[escaped]] = i + 1
+            mask &= ~escaped
+
+    return iterations.reshape(height, width)
 
 
 def run_numpybrot(width, height, max_iterations):
@@ -119,7 +90,7 @@ def run_numpybrot(width, height, max_iterations):
     Returns:
         2D NumPy array of iteration counts
     """
-    return compute_mandelbrot_unrolled(width, height, max_iterations)
+    return compute_mandelbrot_compacted(width, height, max_iterations)
 
 
 if __name__ == "__main__":
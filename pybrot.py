@@ -1,16 +1,23 @@
 """
 PyBrot - Pure Python Mandelbrot Set Computation
 
-This is a reference implementation in pure Python (no shortcuts like NumPy)
-to compare against the SQL-based DuckBrot benchmark. It computes the same
-Mandelbrot set using traditional procedural code.
+This is a reference implementation in pure Python (no NumPy or compiled
+code) to compare against the SQL-based DuckBrot benchmark. It computes the
+same Mandelbrot set using traditional procedural code, with two early-outs
+over the naive loop: points inside the main cardioid or the period-2 bulb
+are not iterated, and an orbit that returns to a snapshot of z (periodicity
+check) stops as bounded.
 
 Author: Thomas Zeutschler
 License: MIT
 GitHub: https://github.com/Zeutschler/sql-mandelbrot-benchmark
 """
 
-from utils import save_mandelbrot_image
+from array import array
+
+import numpy as np
+
+from utils import PERIOD_CHECK_INTERVAL, in_cardioid_or_bulb, save_mandelbrot_image
 
 
 def mandelbrot_iteration(cx, cy, max_iterations):
@@ -25,8 +32,13 @@ def mandelbrot_iteration(cx, cy, max_iterations):
     Returns:
         Number of iterations before escape (or max_iterations if bounded)
     """
+    if in_cardioid_or_bulb(cx, cy):
+        return max_iterations
+
     zx = 0.0
     zy = 0.0
+    saved_zx = 0.0
+    saved_zy = 0.0
     iteration = 0
 
     while iteration < max_iterations:
@@ -42,6 +54,13 @@ def mandelbrot_iteration(cx, cy, max_iterations):
         zy = zy_new
         iteration += 1
 
+        # z came back to the saved value: the orbit is periodic and bounded
+        if zx == saved_zx and zy == saved_zy:
+            return max_iterations
+        if iteration % PERIOD_CHECK_INTERVAL == 0:
+            saved_zx = zx
+            saved_zy = zy
+
     return iteration
 
 
@@ -55,10 +74,11 @@ def compute_mandelbrot(width, height, max_iterations):
         max_iterations: Maximum iterations per pixel
 
     Returns:
-        2D list of iteration counts (height x width)
+        2D numpy uint16 array of iteration counts (height x width)
     """
-    # Initialize result array
-    mandelbrot = [[0 for _ in range(width)] for _ in range(height)]
+    # Initialize result array: one flat, compact uint16 buffer instead of
+    # height x width boxed Python ints
+    mandelbrot = array("H", bytes(2 * width * height))
 
     # Compute complex coordinates for each pixel
     for y in range(height):
@@ -69,14 +89,14 @@ def compute_mandelbrot(width, height, max_iterations):
             cy = -1.0 + (y * 2.0 / (height - 1))
 
             # Compute iterations for this point
-            mandelbrot[y][x] = mandelbrot_iteration(cx, cy, max_iterations)
+            mandelbrot[y * width + x] = mandelbrot_iteration(cx, cy, max_iterations)
 
-    return mandelbrot
+    return np.frombuffer(mandelbrot, dtype=np.uint16).reshape(height, width)
 
 
 def run_pybrot(width, height, max_iterations):
     """
-    Compute Mandelbrot set using pure Python (no shortcuts).
+    Compute Mandelbrot set using pure Python with the cardioid/bulb and periodicity early-outs.
 
     Args:
         width: Image width in pixels
@@ -84,7 +104,7 @@ def run_pybrot(width, height, max_iterations):
         max_iterations: Maximum iterations per pixel
 
     Returns:
-        2D list of iteration counts
+        2D numpy array of iteration counts
     """
     return compute_mandelbrot(width, height, max_iterations)
 
@@ -0,0 +1,196 @@
+/*
+ * PyBrot SIMD - Vectorized Mandelbrot row kernel for FasterPyBrot
+ *
+ * Computes one image row at a time, 8 pixels per AVX-512 instruction
+ * (4 with AVX2, scalar fallback otherwise). The escape test yields a lane
+ * bitmask: a vector is finished as soon as the mask is zero, and with
+ * AVX-512 the counters are written with a single masked store.
+ *
+ * Build with: make simd
+ *
+ * License: MIT
+ * GitHub: https://github.com/Zeutschler/sql-mandelbrot-benchmark
+ */
+
+#include <math.h>
+#include <stdint.h>
+
+#if defined(__AVX512F__) || defined(__AVX2__)
+#include <immintrin.h>
+#endif
+
+/* Iterations between two snapshots of z for the periodicity check */
+#define PERIOD_CHECK_INTERVAL 20
+
+/* Points inside the main cardioid or the period-2 bulb never escape */
+static int in_cardioid_or_bulb(double cx, double cy)
+{
+    double cy2 = cy * cy;
+    double q = (cx - 0.25) * (cx - 0.25) + cy2;
+    return q * (q + (cx - 0.25)) <= 0.25 * cy2 || (cx + 1.0) * (cx + 1.0) + cy2 <= 0.0625;
+}
+
+static uint16_t scalar_iteration(double cx, double cy, int max_iter)
+{
+    double zx = 0.0;
+    double zy = 0.0;
+    double ref_zx = 0.0;
+    double ref_zy = 0.0;
+    int i;
+
+    if (in_cardioid_or_bulb(cx, cy))
+        return (uint16_t)max_iter;
+
+    for (i = 0; i < max_iter; i++) {
+        double zx2 = zx * zx;
+        double zy2 = zy * zy;
+        if (zx2 + zy2 > 4.0)
+            break;
+        /* new zy uses the old zx, so the FMA is issued first */
+        zy = fma(zx + zx, zy, cy);
+        zx = zx2 - zy2 + cx;
+        /* z returned to an earlier value: the orbit is periodic, the point bounded */
+        if (zx == ref_zx && zy == ref_zy)
+            return (uint16_t)max_iter;
+        if ((i + 1) % PERIOD_CHECK_INTERVAL == 0) {
+            ref_zx = zx;
+            ref_zy = zy;
+        }
+    }
+    return (uint16_t)i;
+}
+
+void compute_row(double cy, double cx0, double dcx, uint16_t *out, int width, int max_iter)
+{
+    int x = 0;
+
+#if defined(__AVX512F__)
+    const __m512d lane_idx = _mm512_set_pd(7.0, 6.0, 5.0, 4.0, 3.0, 2.0, 1.0, 0.0);
+    const __m512d dcx_v = _mm512_set1_pd(dcx);
+    const __m512d cy_v = _mm512_set1_pd(cy);
+    const __m512d four = _mm512_set1_pd(4.0);
+    const __m512i one = _mm512_set1_epi64(1);
+    const __m512i max_v = _mm512_set1_epi64(max_iter);
+    const __m512d quarter = _mm512_set1_pd(0.25);
+    const __m512d sixteenth = _mm512_set1_pd(0.0625);
+    const __m512d minus_one = _mm512_set1_pd(-1.0);
+    const __m512d cy2 = _mm512_mul_pd(cy_v, cy_v);
+
+    for (; x < width; x += 8) {
+        /* Lanes past the end of the row are disabled, no scalar tail needed */
+        __mmask8 lanes = width - x >= 8 ? 0xff : (__mmask8)((1u << (width - x)) - 1);
+        __m512d cx0_v = _mm512_set1_pd(cx0 + x * dcx);
+        __m512d cx = _mm512_add_pd(cx0_v, _mm512_mul_pd(lane_idx, dcx_v));
+        __m512d zx = _mm512_setzero_pd();
+        __m512d zy = _mm512_setzero_pd();
+        __m512d ref_zx = zx;
+        __m512d ref_zy = zy;
+
+        /* Lanes inside the cardioid or period-2 bulb start at max_iter, masked off */
+        __m512d xq = _mm512_sub_pd(cx, quarter);
+        __m512d q = _mm512_fmadd_pd(xq, xq, cy2);
+        __m512d xb = _mm512_sub_pd(cx, minus_one);
+        __mmask8 inside = _mm512_cmp_pd_mask(_mm512_mul_pd(q, _mm512_add_pd(q, xq)),
+                                             _mm512_mul_pd(quarter, cy2), _CMP_LE_OQ)
+                        | _mm512_cmp_pd_mask(_mm512_fmadd_pd(xb, xb, cy2), sixteenth, _CMP_LE_OQ);
+        __m512i iters = _mm512_maskz_mov_epi64(inside, max_v);
+        __mmask8 alive = lanes & (__mmask8)~inside;
+
+        for (int i = 0; i < max_iter; i++) {
+            __m512d zx2 = _mm512_mul_pd(zx, zx);
+            __m512d zy2 = _mm512_mul_pd(zy, zy);
+            /* Escaped lanes stay masked off even if |z| drops back below 2 */
+            alive = _mm512_mask_cmp_pd_mask(alive, _mm512_add_pd(zx2, zy2), four, _CMP_LE_OQ);
+            if (!alive)
+                break;
+            iters = _mm512_mask_add_epi64(iters, alive, iters, one);
+            /* 2*zx*zy + cy as one FMA; new zy uses the old zx, so it goes first */
+            __m512d two_zx = _mm512_add_pd(zx, zx);
+            __m512d new_zy = _mm512_fmadd_pd(two_zx, zy, cy_v);
+            __m512d new_zx = _mm512_add_pd(_mm512_sub_pd(zx2, zy2), cx);
+            zx = new_zx;
+            zy = new_zy;
+
+            /* Lanes whose z returned to the snapshot are periodic, hence bounded */
+            __mmask8 cycled = _mm512_mask_cmp_pd_mask(alive, zx, ref_zx, _CMP_EQ_OQ)
+                            & _mm512_cmp_pd_mask(zy, ref_zy, _CMP_EQ_OQ);
+            if (cycled) {
+                iters = _mm512_mask_mov_epi64(iters, cycled, max_v);
+                alive &= (__mmask8)~cycled;
+            }
+            if ((i + 1) % PERIOD_CHECK_INTERVAL == 0) {
+                ref_zx = zx;
+                ref_zy = zy;
+            }
+        }
+
+        /* Narrow the 8 counters to uint16 and store them in one instruction */
+        _mm512_mask_cvtepi64_storeu_epi16(out + x, lanes, iters);
+    }
+#elif defined(__AVX2__)
+    const __m256d lane_idx = _mm256_set_pd(3.0, 2.0, 1.0, 0.0);
+    const __m256d dcx_v = _mm256_set1_pd(dcx);
+    const __m256d cy_v = _mm256_set1_pd(cy);
+    const __m256d four = _mm256_set1_pd(4.0);
+    const __m256d quarter = _mm256_set1_pd(0.25);
+    const __m256d sixteenth = _mm256_set1_pd(0.0625);
+    const __m256d minus_one = _mm256_set1_pd(-1.0);
+    const __m256d cy2 = _mm256_mul_pd(cy_v, cy_v);
+    const __m256i max_v = _mm256_set1_epi64x(max_iter);
+
+    for (; x + 4 <= width; x += 4) {
+        __m256d cx0_v = _mm256_set1_pd(cx0 + x * dcx);
+        __m256d cx = _mm256_add_pd(cx0_v, _mm256_mul_pd(lane_idx, dcx_v));
+        __m256d zx = _mm256_setzero_pd();
+        __m256d zy = _mm256_setzero_pd();
+        __m256d ref_zx = zx;
+        __m256d ref_zy = zy;
+        int64_t counts[4];
+
+        /* Lanes inside the cardioid or period-2 bulb start at max_iter, masked off */
+        __m256d xq = _mm256_sub_pd(cx, quarter);
+        __m256d q = _mm256_fmadd_pd(xq, xq, cy2);
+        __m256d xb = _mm256_sub_pd(cx, minus_one);
+        __m256d inside = _mm256_or_pd(
+            _mm256_cmp_pd(_mm256_mul_pd(q, _mm256_add_pd(q, xq)), _mm256_mul_pd(quarter, cy2), _CMP_LE_OQ),
+            _mm256_cmp_pd(_mm256_fmadd_pd(xb, xb, cy2), sixteenth, _CMP_LE_OQ));
+        __m256i iter = _mm256_and_si256(_mm256_castpd_si256(inside), max_v);
+        __m256d mask = _mm256_andnot_pd(inside, _mm256_castsi256_pd(_mm256_set1_epi64x(-1)));
+
+        for (int i = 0; i < max_iter; i++) {
+            __m256d zx2 = _mm256_mul_pd(zx, zx);
+            __m256d zy2 = _mm256_mul_pd(zy, zy);
+            mask = _mm256_and_pd(mask, _mm256_cmp_pd(_mm256_add_pd(zx2, zy2), four, _CMP_LE_OQ));
+            if (_mm256_movemask_pd(mask) == 0)
+                break;
+            /* Alive lanes hold -1 in the mask, so subtracting it counts them up */
+            iter = _mm256_sub_epi64(iter, _mm256_castpd_si256(mask));
+            __m256d two_zx = _mm256_add_pd(zx, zx);
+            __m256d new_zy = _mm256_fmadd_pd(two_zx, zy, cy_v);
+            __m256d new_zx = _mm256_add_pd(_mm256_sub_pd(zx2, zy2), cx);
+            zx = new_zx;
+            zy = new_zy;
+
+            /* Lanes whose z returned to the snapshot are periodic, hence bounded */
+            __m256d cycled = _mm256_and_pd(mask, _mm256_and_pd(_mm256_cmp_pd(zx, ref_zx, _CMP_EQ_OQ),
+                                                               _mm256_cmp_pd(zy, ref_zy, _CMP_EQ_OQ)));
+            if (_mm256_movemask_pd(cycled) != 0) {
+                iter = _mm256_blendv_epi8(iter, max_v, _mm256_castpd_si256(cycled));
+                mask = _mm256_andnot_pd(cycled, mask);
+            }
+            if ((i + 1) % PERIOD_CHECK_INTERVAL == 0) {
+                ref_zx = zx;
+                ref_zy = zy;
+            }
+        }
+
+        _mm256_storeu_si256((__m256i *)counts, iter);
+        for (int k = 0; k < 4; k++)
+            out[x + k] = (uint16_t)counts[k];
+    }
+#endif
+
+    /* Remaining pixels that do not fill a whole vector */
+    for (; x < width; x++)
+        out[x] = scalar_iteration(cx0 + x * dcx, cy, max_iter);
+}
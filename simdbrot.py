@@ -0,0 +1,100 @@
+"""
+SimdBrot - Explicit-SIMD Mandelbrot Set Computation in C
+
+Every image row is computed by a hand-written AVX2 (8 pixels per vector)
+or AVX-512 (16 pixels per vector) float32 kernel, see mandelbrot_simd.c.
+The best variant the CPU supports is picked once at import, and rows are
+distributed over a thread pool; ctypes releases the GIL while C runs.
+
+The shared library has to be built first with `make simd`.
+
+Author: Ulrich Ludmann
+License: MIT
+GitHub: https://github.com/Zeutschler/sql-mandelbrot-benchmark
+"""
+
+import ctypes
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils import save_mandelbrot_image
+
+SIMD_LIBRARY = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "mandelbrot_simd.so"
+)
+try:
+    _lib = ctypes.CDLL(SIMD_LIBRARY)
+except OSError as e:
+    raise ImportError(f"{SIMD_LIBRARY} not found, build it with `make simd`") from e
+
+# Row kernels by the level reported by mandel_simd_level()
+ROW_KERNELS = ("mandel_row_scalar", "mandel_row_avx2", "mandel_row_avx512")
+
+SIMD_LEVEL = ROW_KERNELS[_lib.mandel_simd_level()]
+_row_kernel = getattr(_lib, SIMD_LEVEL)
+_row_kernel.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_int,
+    ctypes.c_float,
+    ctypes.c_float,
+    ctypes.c_float,
+    ctypes.c_int,
+]
+_row_kernel.restype = None
+
+
+def compute_mandelbrot(width, height, max_iterations):
+    """
+    Compute the Mandelbrot set row by row with the SIMD row kernel.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        max_iterations: Maximum iterations per pixel
+
+    Returns:
+        2D NumPy array of iteration counts (height x width)
+    """
+    mandelbrot = np.empty((height, width), dtype=np.uint16)
+    dx = 3.5 / (width - 1)
+    address = mandelbrot.ctypes.data
+    row_bytes = mandelbrot.strides[0]
+
+    def compute_row(y):
+        cy = -1.0 + y * 2.0 / (height - 1)
+        _row_kernel(address + y * row_bytes, width, cy, -2.5, dx, max_iterations)
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(compute_row, range(height)))
+    return mandelbrot
+
+
+def run_simdbrot(width, height, max_iterations):
+    """
+    Compute Mandelbrot set using the explicit AVX2/AVX-512 C kernels.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        max_iterations: Maximum iterations per pixel
+
+    Returns:
+        2D NumPy array of iteration counts
+    """
+    return compute_mandelbrot(width, height, max_iterations)
+
+
+if __name__ == "__main__":
+    # Standalone execution
+    WIDTH = 1400
+    HEIGHT = 800
+    MAX_ITERATIONS = 256
+
+    print(
+        f"Computing Mandelbrot set ({WIDTH}x{HEIGHT}, max {MAX_ITERATIONS} iterations) "
+        f"with {SIMD_LEVEL}..."
+    )
+    result = run_simdbrot(WIDTH, HEIGHT, MAX_ITERATIONS)
+    save_mandelbrot_image(result, MAX_ITERATIONS, "simdbrot.png")
@@ -2,9 +2,9 @@
 SQLiteBrot - SQLite Mandelbrot Set Computation in Plain SQL
 
 This is a SQLite implementation of the sql-mandelbrot-benchmark.
-It computes the classic Mandelbrot set in plain SQL using recursive CTEs.
-
-SQLite pioneered recursive CTEs and has excellent support for them!
+It computes the classic Mandelbrot set in plain SQL: the cross product of
+the two coordinate axes is a table with one row per pixel, and each
+iteration is one set-based UPDATE.
 
 Author: Thomas Zeutschler
 License: MIT
@@ -16,9 +16,20 @@ import numpy as np
 from utils import save_mandelbrot_image
 
 
+# Number of iterations between two moves of the escaped pixels out of px
+COMPACT_INTERVAL = 16
+
+
 def run_sqlitebrot(width, height, max_iterations):
     """
-    Compute Mandelbrot set using SQLite with recursive CTEs.
+    Compute Mandelbrot set using SQLite with set-based UPDATEs on a pixel table.
+
+    All pixels live in one table px(ix, iy, cx, cy, zx, zy, it). Every
+    iteration is a single UPDATE over the pixels that have not escaped yet,
+    so the database holds one row per pixel instead of one per iteration.
+    Points inside the main cardioid or the period-2 bulb never enter it, and
+    every COMPACT_INTERVAL iterations escaped pixels are moved to a second
+    table, which keeps the UPDATE scans short.
 
     Uses in-memory database for maximum performance.
 
@@ -34,69 +45,95 @@ def run_sqlitebrot(width, height, max_iterations):
     conn = sqlite3.connect(':memory:')
     cursor = conn.cursor()
 
-    # Calculate step sizes
-    x_step = 3.5 / (width - 1)
-    y_step = 2.0 / (height - 1)
-
-    # Build the SQL query - SQLite has excellent recursive CTE support
-    mandelbrot_query = f"""
-    WITH RECURSIVE
-      -- Generate x-axis coordinates
-      xaxis(x, ix) AS (
-        SELECT -2.5, 0
-        UNION ALL
-        SELECT x + {x_step}, ix + 1
-        FROM xaxis
-        WHERE ix < {width - 1}
-      ),
-      -- Generate y-axis coordinates
-      yaxis(y, iy) AS (
-        SELECT -1.0, 0
-        UNION ALL
-        SELECT y + {y_step}, iy + 1
-        FROM yaxis
-        WHERE iy < {height - 1}
-      ),
-      -- Mandelbrot iteration
-      mandelbrot_iterations(iter, ix, iy, cx, cy, zx, zy) AS (
-        SELECT 0, ix, iy, x, y, 0.0, 0.0
-        FROM xaxis, yaxis
-
-        UNION ALL
-
-        SELECT
-          iter + 1,
-          ix,
-          iy,
-          cx,
-          cy,
-          zx * zx - zy * zy + cx,
-          2.0 * zx * zy + cy
-        FROM mandelbrot_iterations
-        WHERE (zx * zx + zy * zy) < 4.0
-          AND iter < {max_iterations}
-      ),
-      -- Get max iteration for each pixel
-      pixel_depths AS (
-        SELECT ix, iy, MAX(iter) AS depth
-        FROM mandelbrot_iterations
-        GROUP BY ix, iy
-      )
-    SELECT ix, iy, depth
-    FROM pixel_depths
-    ORDER BY iy, ix;
+    # The database only lives in memory, skip durability work
+    cursor.execute("PRAGMA synchronous = OFF;")
+    cursor.execute("PRAGMA journal_mode = MEMORY;")
+
+    # Pixel coordinates of both axes, computed in Python
+    x_coords = [(ix, -2.5 + ix * 3.5 / (width - 1)) for ix in range(width)]
+    y_coords = [(iy, -1.0 + iy * 2.0 / (height - 1)) for iy in range(height)]
+
+    # Points inside the main cardioid or the period-2 bulb never escape
+    inside = """
+      ((x - 0.25) * (x - 0.25) + y * y) * ((x - 0.25) * (x - 0.25) + y * y + (x - 0.25)) <= 0.25 * y * y
+      OR (x + 1.0) * (x + 1.0) + y * y <= 0.0625
     """
 
+    # Those points are finished right away with max_iterations
+    insert_inside = f"""
+    INSERT INTO done
+    SELECT ix, iy, {max_iterations}
+    FROM xaxis, yaxis
+    WHERE {inside};
+    """
+
+    # One row per remaining pixel, the cross product of both axes
+    create_pixels = f"""
+    CREATE TABLE px AS
+    SELECT
+      ix,
+      iy,
+      x AS cx,
+      y AS cy,
+      0.0 AS zx,
+      0.0 AS zy,
+      0 AS it
+    FROM xaxis, yaxis
+    WHERE NOT ({inside});
+    """
+
+    # One Mandelbrot iteration for all pixels that have not escaped;
+    # the SET expressions all read the values from before the update
+    iterate = """
+    UPDATE px
+    SET
+      zx = zx * zx - zy * zy + cx,
+      zy = 2.0 * zx * zy + cy,
+      it = it + 1
+    WHERE (zx * zx + zy * zy) <= 4.0;
+    """
+
+    # Move the escaped pixels with their final depth out of px
+    compact = [
+        "INSERT INTO done SELECT ix, iy, it FROM px WHERE (zx * zx + zy * zy) > 4.0;",
+        "DELETE FROM px WHERE (zx * zx + zy * zy) > 4.0;",
+    ]
+
     try:
-        cursor.execute(mandelbrot_query)
-        result = cursor.fetchall()
+        cursor.execute("CREATE TABLE xaxis (ix INTEGER PRIMARY KEY, x REAL);")
+        cursor.execute("CREATE TABLE yaxis (iy INTEGER PRIMARY KEY, y REAL);")
+        with conn:
+            cursor.executemany("INSERT INTO xaxis VALUES (?, ?);", x_coords)
+            cursor.executemany("INSERT INTO yaxis VALUES (?, ?);", y_coords)
+
+        cursor.execute("CREATE TABLE done (ix INTEGER, iy INTEGER, it INTEGER);")
+        cursor.execute(insert_inside)
+        cursor.execute(create_pixels)
+
+        for i in range(max_iterations):
+            cursor.execute(iterate)
+            if cursor.rowcount == 0:
+                # Every pixel has escaped
+                break
+            if (i + 1) % COMPACT_INTERVAL == 0:
+                for statement in compact:
+                    cursor.execute(statement)
+
+        # Stream the rows straight into a preallocated structured array
+        # instead of building a list of tuples first
+        cursor.arraysize = 10000
+        cursor.execute("SELECT ix, iy, it FROM px UNION ALL SELECT ix, iy, it FROM done;")
+        rows = np.fromiter(
+            cursor,
+            dtype=[("ix", np.int32), ("iy", np.int32), ("depth", np.uint16)],
+            count=width * height,
+        )
         cursor.close()
         conn.close()
 
-        # Convert to numpy array
+        # Convert to numpy array, each depth goes to its (iy, ix) pixel
         mandelbrot = np.zeros((height, width), dtype=np.uint16)
-        for ix, iy, depth in result:
-            mandelbrot[iy, ix] = depth
+        mandelbrot[rows["iy"], rows["ix"]] = rows["depth"]
 
         return mandelbrot
 
@@ -6,12 +6,38 @@ License: MIT
 """
 
 import os
+import statistics
 import time
 import numpy as np
 from PIL import Image
 from matplotlib import colormaps
 
 
+# Iterations between two snapshots of z for the periodicity check
+PERIOD_CHECK_INTERVAL = 20
+
+
+def in_cardioid_or_bulb(cx, cy):
+    """
+    Test whether points lie inside the main cardioid or the period-2 bulb.
+
+    Those points never escape, so they can be set to max_iterations without
+    iterating. Works on scalars as well as on NumPy arrays.
+
+    Args:
+        cx: Real part of complex number c
+        cy: Imaginary part of complex number c
+
+    Returns:
+        True (or boolean array) where the point is inside
+    """
+    cy_squared = cy * cy
+    q = (cx - 0.25) * (cx - 0.25) + cy_squared
+    in_cardioid = q * (q + (cx - 0.25)) <= 0.25 * cy_squared
+    in_bulb = (cx + 1.0) * (cx + 1.0) + cy_squared <= 0.0625
+    return in_cardioid | in_bulb
+
+
 def save_mandelbrot_image(mandelbrot_data, max_iterations, filename='output.png'):
     """
     Save Mandelbrot set data as a colorized image with logarithmic scaling.
@@ -57,30 +83,53 @@ def save_mandelbrot_image(mandelbrot_data, max_iterations, filename='output.png'
     print(f"Saved to {filepath}")
 
 
+# Untimed runs before measuring (JIT compilation, caches, lazy setup)
+WARMUP = 1
+
+# Timed runs per benchmark; the median is reported
+RUNS = 5
+
+
 def run_benchmark(name, compute_func, *args):
     """
     Run a single benchmark and return timing results.
 
+    The function is run WARMUP times untimed, then RUNS times timed with
+    time.perf_counter_ns(); the median of the timed runs is reported.
+
     Args:
         name: Benchmark name
         compute_func: Function to execute
         *args: Arguments to pass to compute_func
 
     Returns:
-        Tuple of (result, elapsed_ms)
+        Tuple of (result, elapsed_ms) with the median time in milliseconds
     """
     print(f"\n{'='*60}")
     print(f"Running: {name}")
     print(f"{'='*60}")
 
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     try:
-        result = compute_func(*args)
-        elapsed_ms = (time.time() - start_time) * 1000
-        print(f"✓ Completed in {elapsed_ms:.2f} ms")
+        for _ in range(WARMUP):
+            compute_func(*args)
+
+        timings_ns = []
+        for _ in range(RUNS):
+            start_time = time.perf_counter_ns()
+            result = compute_func(*args)
+            timings_ns.append(time.perf_counter_ns() - start_time)
+
+        timings_ms = [t / 1e6 for t in timings_ns]
+        elapsed_ms = statistics.median(timings_ms)
+        stdev_ms = statistics.stdev(timings_ms) if len(timings_ms) > 1 else 0.0
+        print(
+            f"✓ Completed in {elapsed_ms:.2f} ms (median of {RUNS}, "
+            f"min {min(timings_ms):.2f} ms, stdev {stdev_ms:.2f} ms)"
+        )
         return result, elapsed_ms
     except Exception as e:
-        elapsed_ms = (time.time() - start_time) * 1000
+        elapsed_ms = (time.perf_counter_ns() - start_time) / 1e6
         print(f"✗ Failed after {elapsed_ms:.2f} ms: {e}")
         return None, None
 